@@ -17,6 +17,7 @@ PERMANENT_FAILURE_CODES = {
 }
 
 _SECONDARY_RESET_UNKNOWN_SORT_VALUE = 2**63 - 1
+_UNSELECTABLE_STATUSES = frozenset({AccountStatus.DEACTIVATED, AccountStatus.PAUSED})
 
 # Tier weights encode a mild preference for higher tiers (latency and likely response quality),
 # without trying to predict per-request token usage/cost.
@@ -60,7 +61,7 @@ class SelectionTrace:
     selected_primary_used_percent: float | None
 
 
-@dataclass
+@dataclass(slots=True)
 class AccountState:
     account_id: str
     status: AccountStatus
@@ -78,7 +79,7 @@ class AccountState:
     deactivation_reason: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class SelectionResult:
     account: AccountState | None
     error_message: str | None
@@ -95,11 +96,11 @@ def select_account(
     all_states = list(states)
 
     for state in all_states:
-        if state.status == AccountStatus.DEACTIVATED:
+        status = state.status
+        if status in _UNSELECTABLE_STATUSES:
             continue
-        if state.status == AccountStatus.PAUSED:
-            continue
-        if state.status == AccountStatus.RATE_LIMITED:
+        # Enum members are singletons, so identity checks avoid `str.__eq__` on this per-account path.
+        if status is AccountStatus.RATE_LIMITED:
             if state.reset_at and current >= state.reset_at:
                 state.status = AccountStatus.ACTIVE
                 state.error_count = 0
@@ -107,7 +108,7 @@ def select_account(
                 state.reset_at = None
             else:
                 continue
-        if state.status == AccountStatus.QUOTA_EXCEEDED:
+        elif status is AccountStatus.QUOTA_EXCEEDED:
             if state.reset_at and current >= state.reset_at:
                 state.status = AccountStatus.ACTIVE
                 state.used_percent = 0.0
@@ -21,28 +21,32 @@ from app.core.errors import (
     response_failed_event,
 )
 from app.core.openai.models import OpenAIResponsePayload
-from app.core.openai.parsing import parse_error_payload, parse_response_payload, parse_sse_event
+from app.core.openai.parsing import event_type_of, parse_error_payload, parse_event_payload, parse_response_payload
 from app.core.openai.requests import ResponsesCompactRequest, ResponsesRequest
 from app.core.types import JsonObject, JsonValue
 from app.core.utils.request_id import get_request_id
-from app.core.utils.sse import format_sse_event
-
-IGNORE_INBOUND_HEADERS = {
-    "authorization",
-    "chatgpt-account-id",
-    "content-length",
-    "host",
-    "forwarded",
-    "x-real-ip",
-    "true-client-ip",
-    # Internal codex-lb routing controls (never forward to upstream).
-    "x-codex-lb-force-account-id",
-    # Note: we intentionally do NOT drop Codex diagnostic headers such as:
-    # - `x-codex-session-id`
-    # - `x-codex-conversation-id`
-    # They are used only for request logging/correlation and may or may not be present depending on
-    # the Codex client/version/route.
-}
+from app.core.utils.sse import dump_sse_json, format_sse_event, parse_sse_data_json
+
+IGNORE_INBOUND_HEADERS = frozenset(
+    {
+        "authorization",
+        "chatgpt-account-id",
+        "content-length",
+        "host",
+        "forwarded",
+        "x-real-ip",
+        "true-client-ip",
+        # Internal codex-lb routing controls (never forward to upstream).
+        "x-codex-lb-force-account-id",
+        # Note: we intentionally do NOT drop Codex diagnostic headers such as:
+        # - `x-codex-session-id`
+        # - `x-codex-conversation-id`
+        # They are used only for request logging/correlation and may or may not be present depending on
+        # the Codex client/version/route.
+    }
+)
+# Proxy/CDN-added header families, matched by prefix.
+_IGNORE_INBOUND_HEADER_PREFIXES = ("x-forwarded-", "cf-")
 
 _ERROR_TYPE_CODE_MAP = {
     "rate_limit_exceeded": "rate_limit_exceeded",
@@ -58,6 +62,7 @@ _SSE_EVENT_TYPE_ALIASES = {
 }
 
 _SSE_READ_CHUNK_SIZE = 8 * 1024
+_TERMINAL_EVENT_TYPES = frozenset({"response.completed", "response.failed", "response.incomplete"})
 _IMAGE_INLINE_MAX_BYTES = 8 * 1024 * 1024
 _IMAGE_INLINE_CHUNK_SIZE = 64 * 1024
 _IMAGE_INLINE_TIMEOUT_SECONDS = 8.0
@@ -110,13 +115,7 @@ class ProxyResponseError(Exception):
 
 def _should_drop_inbound_header(name: str) -> bool:
     normalized = name.lower()
-    if normalized in IGNORE_INBOUND_HEADERS:
-        return True
-    if normalized.startswith("x-forwarded-"):
-        return True
-    if normalized.startswith("cf-"):
-        return True
-    return False
+    return normalized in IGNORE_INBOUND_HEADERS or normalized.startswith(_IGNORE_INBOUND_HEADER_PREFIXES)
 
 
 def filter_inbound_headers(headers: Mapping[str, str]) -> dict[str, str]:
@@ -306,7 +305,7 @@ def _normalize_sse_data_line(line: str) -> str:
     event_type = payload.get("type")
     if isinstance(event_type, str) and event_type in _SSE_EVENT_TYPE_ALIASES:
         payload["type"] = _SSE_EVENT_TYPE_ALIASES[event_type]
-        return f"data: {json.dumps(payload, ensure_ascii=True, separators=(',', ':'))}"
+        return f"data: {dump_sse_json(payload)}"
     return line
 
 
@@ -661,11 +660,10 @@ async def stream_responses(
                 settings.max_sse_event_bytes,
             ):
                 event_block = _normalize_sse_event_block(event_block)
-                event = parse_sse_event(event_block)
-                if event:
-                    event_type = event.type
-                    if event_type in ("response.completed", "response.failed", "response.incomplete"):
-                        seen_terminal = True
+                if not seen_terminal:
+                    event_payload = parse_sse_data_json(event_block)
+                    if event_type_of(event_payload) in _TERMINAL_EVENT_TYPES:
+                        seen_terminal = parse_event_payload(event_payload) is not None
                 yield event_block
     except ProxyResponseError:
         raise
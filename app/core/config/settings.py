@@ -110,6 +110,16 @@ class Settings(BaseSettings):
     # (rate limit/quota/permanent failure), so even with a higher TTL it can react quickly to
     # request-observed failures.
     proxy_snapshot_ttl_seconds: float = Field(default=10.0, gt=0)
+    # TTL (seconds) for the cached `x-codex-*` rate-limit response headers.
+    #
+    # The cache is also invalidated whenever usage rows are written, so a longer TTL mostly bounds how
+    # long window aggregates can drift as old samples age out of the window.
+    rate_limit_headers_cache_ttl_seconds: float = Field(default=60.0, gt=0)
+    # TTL (seconds) for the usage view behind `/api/codex/usage`.
+    #
+    # Also invalidated on usage writes. Kept short because the view also reflects account status and plan
+    # changes, which do not invalidate it.
+    rate_limit_payload_cache_ttl_seconds: float = Field(default=5.0, gt=0)
     # Proxy account selection algorithm:
     # Tier-aware hybrid account selection is always enabled. The legacy strategy toggle was removed.
     http_client_connector_limit: int = Field(default=256, gt=0)
@@ -12,8 +12,11 @@ _RESPONSE_ADAPTER = TypeAdapter(OpenAIResponsePayload)
 
 
 def parse_sse_event(line: str) -> OpenAIEvent | None:
-    payload = parse_sse_data_json(line)
-    if payload is None:
+    return parse_event_payload(parse_sse_data_json(line))
+
+
+def parse_event_payload(payload: JsonValue) -> OpenAIEvent | None:
+    if not isinstance(payload, dict):
         return None
     try:
         return _EVENT_ADAPTER.validate_python(payload)
@@ -21,6 +24,14 @@ def parse_sse_event(line: str) -> OpenAIEvent | None:
         return None
 
 
+def event_type_of(payload: JsonValue) -> str | None:
+    # Equals `parse_event_payload(payload).type` whenever that validates, without building the model.
+    if not isinstance(payload, dict):
+        return None
+    event_type = payload.get("type")
+    return event_type if isinstance(event_type, str) else None
+
+
 def parse_error_payload(payload: JsonValue) -> OpenAIError | None:
     if not isinstance(payload, dict):
         return None
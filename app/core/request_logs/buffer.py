@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import datetime
 from functools import lru_cache
 
@@ -72,25 +72,11 @@ def get_request_log_buffer() -> RequestLogBuffer:
 
 
 def enqueue_request_log(entry: RequestLogCreate) -> bool:
-    normalized = RequestLogCreate(
-        account_id=entry.account_id,
-        request_id=ensure_request_id(entry.request_id),
-        model=entry.model,
-        input_tokens=entry.input_tokens,
-        output_tokens=entry.output_tokens,
-        cached_input_tokens=entry.cached_input_tokens,
-        reasoning_tokens=entry.reasoning_tokens,
-        reasoning_effort=entry.reasoning_effort,
-        latency_ms=entry.latency_ms,
-        status=entry.status,
-        error_code=entry.error_code,
-        error_message=entry.error_message,
-        prompt_cache_key_hash=entry.prompt_cache_key_hash,
-        codex_session_id=entry.codex_session_id,
-        codex_conversation_id=entry.codex_conversation_id,
-        requested_at=entry.requested_at,
-    )
-    ok = get_request_log_buffer().try_enqueue(normalized)
+    request_id = ensure_request_id(entry.request_id)
+    # Callers almost always pass the final request id, so the entry is only copied when it changes.
+    if request_id != entry.request_id:
+        entry = replace(entry, request_id=request_id)
+    ok = get_request_log_buffer().try_enqueue(entry)
     if not ok:
         get_metrics().inc_request_log_buffer_dropped()
     return ok
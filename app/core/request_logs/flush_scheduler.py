@@ -62,9 +62,16 @@ class RequestLogsFlushScheduler:
     async def _flush_once(self) -> None:
         async with self._lock:
             buffer = get_request_log_buffer()
-            if buffer.size() == 0:
-                return
-            await self._flush_batch(buffer.drain(self.max_batch))
+            # Drain the whole backlog seen at the start of the tick (in `max_batch` inserts) so
+            # sustained traffic above `max_batch / interval_seconds` does not pile up until the
+            # buffer overflows and drops entries. Entries arriving meanwhile wait for the next tick.
+            pending = buffer.size()
+            while pending > 0:
+                batch = buffer.drain(min(pending, self.max_batch))
+                if not batch:
+                    return
+                pending -= len(batch)
+                await self._flush_batch(batch)
 
     async def _flush_until_empty(self) -> None:
         buffer = get_request_log_buffer()
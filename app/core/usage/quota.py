@@ -5,6 +5,9 @@ import time
 from app.core import usage as usage_core
 from app.db.models import AccountStatus
 
+# Operator/auth-driven statuses are never derived from usage, so they pass through untouched.
+_USAGE_EXEMPT_STATUSES = frozenset({AccountStatus.DEACTIVATED, AccountStatus.PAUSED})
+
 
 def apply_usage_quota(
     *,
@@ -19,7 +22,7 @@ def apply_usage_quota(
     used_percent = primary_used
     reset_at = runtime_reset
 
-    if status in (AccountStatus.DEACTIVATED, AccountStatus.PAUSED):
+    if status in _USAGE_EXEMPT_STATUSES:
         return status, used_percent, reset_at
 
     if secondary_used is not None:
@@ -39,13 +42,13 @@ def apply_usage_quota(
             if secondary_reset is not None:
                 reset_at = secondary_reset
             return status, used_percent, reset_at
-        if status == AccountStatus.QUOTA_EXCEEDED:
+        if status is AccountStatus.QUOTA_EXCEEDED:
             if runtime_reset and runtime_reset > time.time():
                 reset_at = runtime_reset
             else:
                 status = AccountStatus.ACTIVE
                 reset_at = None
-    elif status == AccountStatus.QUOTA_EXCEEDED and secondary_reset is not None:
+    elif status is AccountStatus.QUOTA_EXCEEDED and secondary_reset is not None:
         reset_at = secondary_reset
 
     if primary_used is not None:
@@ -57,7 +60,7 @@ def apply_usage_quota(
             else:
                 reset_at = _fallback_primary_reset(primary_window_minutes) or reset_at
             return status, used_percent, reset_at
-        if status == AccountStatus.RATE_LIMITED:
+        if status is AccountStatus.RATE_LIMITED:
             if runtime_reset and runtime_reset > time.time():
                 reset_at = runtime_reset
             else:
@@ -67,7 +70,7 @@ def apply_usage_quota(
     # `reset_at` is a persisted "blocked until" hint and should only be meaningful for blocked
     # statuses. Returning a non-null reset timestamp while `status=ACTIVE` creates an inconsistent
     # state in the accounts DB (and can confuse operators when debugging).
-    if status == AccountStatus.ACTIVE:
+    if status is AccountStatus.ACTIVE:
         reset_at = None
 
     return status, used_percent, reset_at
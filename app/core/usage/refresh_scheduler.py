@@ -58,11 +58,12 @@ class UsageRefreshScheduler:
             try:
                 usage_repo = UsageRepository(main_session)
                 accounts_repo = AccountsRepository(accounts_session)
-                latest_usage = await usage_repo.latest_by_account(window="primary")
+                latest_primary, latest_secondary = await usage_repo.latest_primary_secondary_by_account()
                 accounts = await accounts_repo.list_accounts()
                 updater = UsageUpdater(usage_repo, accounts_repo)
-                await updater.refresh_accounts(accounts, latest_usage)
-                latest_secondary = await usage_repo.latest_by_account(window="secondary")
+                # Rows written by the refresh are newer than anything read above, so merge them in
+                # memory instead of re-reading the secondary window.
+                latest_secondary.update(await updater.refresh_accounts(accounts, latest_primary))
                 metrics = get_metrics()
                 metrics.refresh_account_identity_gauges(
                     [
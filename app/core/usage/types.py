@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from datetime import datetime
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class UsageWindowRow:
     account_id: str
     used_percent: float | None
@@ -12,7 +12,7 @@ class UsageWindowRow:
     window_minutes: int | None = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class UsageAggregateRow:
     account_id: str
     used_percent_avg: float | None
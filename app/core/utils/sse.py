@@ -9,9 +9,13 @@ from app.core.utils.json_guards import is_json_dict
 
 type JsonPayload = Mapping[str, JsonValue] | ResponseFailedEvent
 
+# `json.dumps` builds a fresh JSONEncoder on every call whose options differ from the defaults, so
+# the compact SSE encoder is created once and reused.
+_COMPACT_JSON_ENCODER = json.JSONEncoder(ensure_ascii=True, separators=(",", ":"))
+
 
 def format_sse_event(payload: JsonPayload) -> str:
-    data = json.dumps(payload, ensure_ascii=True, separators=(",", ":"))
+    data = dump_sse_json(payload)
     event_type = payload.get("type")
     if isinstance(event_type, str) and event_type:
         return f"event: {event_type}\ndata: {data}\n\n"
@@ -19,10 +23,14 @@ def format_sse_event(payload: JsonPayload) -> str:
 
 
 def format_sse_data(payload: Mapping[str, JsonValue]) -> str:
-    data = json.dumps(payload, ensure_ascii=True, separators=(",", ":"))
+    data = dump_sse_json(payload)
     return f"data: {data}\n\n"
 
 
+def dump_sse_json(payload: JsonPayload) -> str:
+    return _COMPACT_JSON_ENCODER.encode(payload)
+
+
 def parse_sse_data_json(event_block: str) -> dict[str, JsonValue] | None:
     data = extract_sse_data(event_block)
     if data is None:
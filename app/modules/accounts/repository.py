@@ -4,7 +4,7 @@ from collections.abc import Sequence
 from dataclasses import dataclass
 from datetime import datetime
 
-from sqlalchemy import delete, select, update
+from sqlalchemy import case, delete, literal, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import Account, AccountStatus
@@ -75,21 +75,35 @@ class AccountsRepository:
     async def bulk_update_status_fields(self, updates: Sequence[AccountStatusUpdate]) -> int:
         if not updates:
             return 0
-        updated = 0
-        for entry in updates:
-            normalized_reset_at = _normalize_reset_at_for_status(entry.status, entry.reset_at)
-            result = await self._session.execute(
-                update(Account)
-                .where(Account.id == entry.account_id)
-                .values(
-                    status=entry.status,
-                    deactivation_reason=entry.deactivation_reason,
-                    reset_at=normalized_reset_at,
-                )
-                .returning(Account.id)
+        # Later entries win for duplicate ids, matching the previous one-UPDATE-per-entry behavior.
+        by_id = {entry.account_id: entry for entry in updates}
+        status_type = Account.__table__.c.status.type
+        result = await self._session.execute(
+            update(Account)
+            .where(Account.id.in_(list(by_id)))
+            .values(
+                status=case(
+                    {account_id: literal(entry.status, status_type) for account_id, entry in by_id.items()},
+                    value=Account.id,
+                ),
+                deactivation_reason=case(
+                    {account_id: entry.deactivation_reason for account_id, entry in by_id.items()},
+                    value=Account.id,
+                ),
+                reset_at=case(
+                    {
+                        account_id: _normalize_reset_at_for_status(entry.status, entry.reset_at)
+                        for account_id, entry in by_id.items()
+                    },
+                    value=Account.id,
+                ),
             )
-            if result.scalar_one_or_none() is not None:
-                updated += 1
+            # CASE values cannot be evaluated in Python, and a fetch sync would expire loaded rows.
+            # Callers already mirror the new fields onto the instances they hold.
+            .execution_options(synchronize_session=False)
+            .returning(Account.id)
+        )
+        updated = len(result.scalars().all())
         await self._session.commit()
         return updated
 
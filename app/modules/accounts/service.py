@@ -23,6 +23,7 @@ from app.modules.accounts.schemas import (
     AccountSummary,
 )
 from app.modules.accounts.status_reconcile import stale_blocked_account_ids
+from app.modules.proxy.rate_limit_cache import invalidate_rate_limit_caches
 from app.modules.settings.repository import SettingsRepository
 from app.modules.usage.repository import UsageRepository
 from app.modules.usage.updater import UsageUpdater
@@ -46,6 +47,8 @@ class AccountsService:
     @classmethod
     def invalidate_cache(cls) -> None:
         invalidate_accounts_list_cache()
+        # Rate limit headers and the usage view read account status and plan.
+        invalidate_rate_limit_caches()
 
     async def list_accounts(self) -> list[AccountSummary]:
         async def _build() -> list[AccountSummary]:
@@ -67,6 +70,7 @@ class AccountsService:
             )
             if stale_ids:
                 await self._repo.bulk_set_active(sorted(stale_ids))
+                invalidate_rate_limit_caches()
                 for account in accounts:
                     if account.id in stale_ids:
                         account.status = AccountStatus.ACTIVE
@@ -85,6 +89,7 @@ class AccountsService:
             }
             if inconsistent_ids:
                 await self._repo.bulk_clear_reset_at(sorted(inconsistent_ids))
+                invalidate_rate_limit_caches()
                 for account in accounts:
                     if account.id in inconsistent_ids:
                         account.reset_at = None
@@ -40,6 +40,7 @@ from app.modules.oauth.schemas import (
     OauthStartResponse,
     OauthStatusResponse,
 )
+from app.modules.proxy.rate_limit_cache import invalidate_rate_limit_caches
 
 _async_sleep = asyncio.sleep
 _SUCCESS_TEMPLATE = Path(__file__).resolve().parent / "templates" / "oauth_success.html"
@@ -321,6 +322,7 @@ class OauthService:
         else:
             await self._accounts_repo.upsert(account)
         invalidate_accounts_list_cache()
+        invalidate_rate_limit_caches()
 
     async def _set_success(self) -> None:
         async with self._store.lock:
@@ -88,8 +88,9 @@ async def v1_responses(
 @v1_router.get("/models", response_model=ModelListResponse)
 async def v1_models() -> ModelListResponse:
     created = int(time.time())
+    # Catalog entries are validated once at import time; FastAPI still validates the response model.
     items = [
-        ModelListItem(
+        ModelListItem.model_construct(
             id=model_id,
             created=created,
             owned_by="codex-lb",
@@ -97,7 +98,7 @@ async def v1_models() -> ModelListResponse:
         )
         for model_id, entry in MODEL_CATALOG.items()
     ]
-    return ModelListResponse(data=items)
+    return ModelListResponse.model_construct(data=items)
 
 
 @v1_router.post(
@@ -222,6 +222,12 @@ def _normalize_error_code(code: str | None, error_type: str | None) -> str:
     return value.lower()
 
 
+def _error_code_from_openai(error: OpenAIError | None) -> str:
+    if error is None:
+        return _normalize_error_code(None, None)
+    return _normalize_error_code(error.code, error.type)
+
+
 def _parse_openai_error(payload: OpenAIErrorEnvelope) -> OpenAIError | None:
     error = payload.get("error")
     if not error:
@@ -271,15 +277,12 @@ def _apply_error_metadata(target: OpenAIErrorDetail, error: OpenAIError | None)
 def _upstream_error_from_openai(error: OpenAIError | None) -> UpstreamError:
     if not error:
         return {}
-    data = error.model_dump(exclude_none=True)
+    # The declared fields are strictly typed, so they can be read directly instead of via model_dump().
     payload: UpstreamError = {}
-    message = data.get("message")
-    if isinstance(message, str):
-        payload["message"] = message
-    resets_at = data.get("resets_at")
-    if isinstance(resets_at, (int, float)):
-        payload["resets_at"] = resets_at
-    resets_in_seconds = data.get("resets_in_seconds")
-    if isinstance(resets_in_seconds, (int, float)):
-        payload["resets_in_seconds"] = resets_in_seconds
+    if error.message is not None:
+        payload["message"] = error.message
+    if error.resets_at is not None:
+        payload["resets_at"] = error.resets_at
+    if error.resets_in_seconds is not None:
+        payload["resets_in_seconds"] = error.resets_in_seconds
     return payload
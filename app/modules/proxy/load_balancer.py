@@ -4,9 +4,9 @@ import asyncio
 import logging
 import time
 from collections import OrderedDict, deque
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Iterable
+from typing import Sequence
 
 from app.core import usage as usage_core
 from app.core.balancer import (
@@ -26,6 +26,7 @@ from app.core.usage.quota import apply_usage_quota
 from app.core.utils.request_id import get_request_id
 from app.db.models import Account, AccountStatus, UsageHistory
 from app.modules.accounts.repository import AccountsRepository, AccountStatusUpdate
+from app.modules.proxy.rate_limit_cache import invalidate_rate_limit_caches
 from app.modules.proxy.repo_bundle import ProxyRepoFactory
 from app.modules.proxy.sticky_repository import StickySessionsRepository
 
@@ -33,7 +34,7 @@ logger = logging.getLogger(__name__)
 UTC = timezone.utc
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class RuntimeState:
     reset_at: float | None = None
     cooldown_until: float | None = None
@@ -43,7 +44,7 @@ class RuntimeState:
     usage_limit_error_count: int = 0
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class AccountSelection:
     account: Account | None
     error_message: str | None
@@ -117,6 +118,18 @@ class _Snapshot:
     account_map: dict[str, Account]
     pinned_account_ids: frozenset[str]
     updated_at: float
+    _pinned_states: list[AccountState] | None = field(default=None, init=False, repr=False)
+
+    def pinned_states(self) -> list[AccountState]:
+        # The pinned pool only depends on fields fixed for the snapshot's lifetime, so it is
+        # filtered once per snapshot instead of once per selection.
+        if self._pinned_states is None:
+            self._pinned_states = (
+                [state for state in self.states if state.account_id in self.pinned_account_ids]
+                if self.pinned_account_ids
+                else self.states
+            )
+        return self._pinned_states
 
 
 class LoadBalancer:
@@ -152,7 +165,7 @@ class LoadBalancer:
             return AccountSelection(account=None, error_message="Forced account not found")
 
         selected_snapshot = _clone_account(selected)
-        runtime = self._runtime.setdefault(selected_snapshot.id, RuntimeState())
+        runtime = _runtime_for(self._runtime, selected_snapshot.id)
         runtime.last_selected_at = time.time()
         return AccountSelection(account=selected_snapshot, error_message=None)
 
@@ -171,6 +184,7 @@ class LoadBalancer:
         reallocate_sticky: bool,
         result: SelectionResult,
         fallback_from_pinned: bool,
+        now: float,
     ) -> None:
         trace = result.trace
         score_tuples: tuple[tuple[str, float], ...] = (
@@ -202,7 +216,7 @@ class LoadBalancer:
         )
         self._debug_events.append(
             LoadBalancerSelectionEvent(
-                ts_epoch=time.time(),
+                ts_epoch=now,
                 request_id=get_request_id(),
                 pool=pool,
                 sticky_backend=sticky_backend,
@@ -312,10 +326,14 @@ class LoadBalancer:
     ) -> AccountSelection:
         await self._maybe_invalidate_snapshot_on_pinned_change()
         snapshot = await self._get_snapshot()
-        original_account_fields: dict[str, tuple[AccountStatus, str | None, int | None]] = {
-            account_id: (account.status, account.deactivation_reason, account.reset_at)
-            for account_id, account in snapshot.account_map.items()
-        }
+        # One wall-clock read per selection: eligibility checks, sticky TTLs, debug events and the
+        # `last_selected_at` stamp all share it.
+        now = time.time()
+        # `snapshot.accounts` and `snapshot.states` share the same order, so the fields are kept
+        # positionally and compared against the states by zipping instead of by id lookup.
+        original_account_fields = [
+            (account.status, account.deactivation_reason, account.reset_at) for account in snapshot.accounts
+        ]
         selected_snapshot: Account | None = None
         error_message: str | None = None
         # Routing pool ("pinned accounts") is applied before stickiness:
@@ -329,11 +347,7 @@ class LoadBalancer:
         # (or explicitly reallocated), but stickiness does not proactively migrate just because some
         # other account later becomes a "better" selector candidate.
         pinned_active = bool(snapshot.pinned_account_ids)
-        pinned_states = (
-            [state for state in snapshot.states if state.account_id in snapshot.pinned_account_ids]
-            if pinned_active
-            else snapshot.states
-        )
+        pinned_states = snapshot.pinned_states()
 
         settings = get_settings()
         sticky_backend_setting = settings.sticky_sessions_backend
@@ -351,6 +365,7 @@ class LoadBalancer:
                     sticky_key=sticky_key,
                     reallocate_sticky=reallocate_sticky,
                     sticky_repo=repos.sticky_sessions,
+                    now=now,
                 )
                 get_metrics().observe_lb_select(
                     pool="pinned" if pinned_active else "full",
@@ -364,6 +379,7 @@ class LoadBalancer:
                     reallocate_sticky=reallocate_sticky,
                     result=result,
                     fallback_from_pinned=False,
+                    now=now,
                 )
                 if pinned_active and result.account is None:
                     pinned_result = result
@@ -373,6 +389,7 @@ class LoadBalancer:
                         sticky_key=sticky_key,
                         reallocate_sticky=reallocate_sticky,
                         sticky_repo=repos.sticky_sessions,
+                        now=now,
                     )
                     get_metrics().observe_lb_select(
                         pool="full",
@@ -386,6 +403,7 @@ class LoadBalancer:
                         reallocate_sticky=reallocate_sticky,
                         result=result,
                         fallback_from_pinned=True,
+                        now=now,
                     )
                     self._maybe_log_pinned_fallback(
                         pinned_states=pinned_states,
@@ -394,6 +412,7 @@ class LoadBalancer:
                         full_result=result,
                         sticky_backend=sticky_backend,
                         reallocate_sticky=reallocate_sticky,
+                        now=now,
                     )
         elif sticky_key and sticky_backend == "memory":
             result = await self._select_with_memory_stickiness(
@@ -401,6 +420,7 @@ class LoadBalancer:
                 account_map=snapshot.account_map,
                 sticky_key=sticky_key,
                 reallocate_sticky=reallocate_sticky,
+                now=now,
             )
             get_metrics().observe_lb_select(
                 pool="pinned" if pinned_active else "full",
@@ -414,6 +434,7 @@ class LoadBalancer:
                 reallocate_sticky=reallocate_sticky,
                 result=result,
                 fallback_from_pinned=False,
+                now=now,
             )
             if pinned_active and result.account is None:
                 pinned_result = result
@@ -422,6 +443,7 @@ class LoadBalancer:
                     account_map=snapshot.account_map,
                     sticky_key=sticky_key,
                     reallocate_sticky=reallocate_sticky,
+                    now=now,
                 )
                 get_metrics().observe_lb_select(
                     pool="full",
@@ -435,6 +457,7 @@ class LoadBalancer:
                     reallocate_sticky=reallocate_sticky,
                     result=result,
                     fallback_from_pinned=True,
+                    now=now,
                 )
                 self._maybe_log_pinned_fallback(
                     pinned_states=pinned_states,
@@ -443,9 +466,10 @@ class LoadBalancer:
                     full_result=result,
                     sticky_backend=sticky_backend,
                     reallocate_sticky=reallocate_sticky,
+                    now=now,
                 )
         else:
-            result = select_account(pinned_states)
+            result = select_account(pinned_states, now)
             get_metrics().observe_lb_select(
                 pool="pinned" if pinned_active else "full",
                 sticky_backend=sticky_backend,
@@ -458,10 +482,11 @@ class LoadBalancer:
                 reallocate_sticky=reallocate_sticky,
                 result=result,
                 fallback_from_pinned=False,
+                now=now,
             )
             if pinned_active and result.account is None:
                 pinned_result = result
-                result = select_account(snapshot.states)
+                result = select_account(snapshot.states, now)
                 get_metrics().observe_lb_select(
                     pool="full",
                     sticky_backend=sticky_backend,
@@ -474,6 +499,7 @@ class LoadBalancer:
                     reallocate_sticky=reallocate_sticky,
                     result=result,
                     fallback_from_pinned=True,
+                    now=now,
                 )
 
                 self._maybe_log_pinned_fallback(
@@ -483,16 +509,14 @@ class LoadBalancer:
                     full_result=result,
                     sticky_backend=sticky_backend,
                     reallocate_sticky=reallocate_sticky,
+                    now=now,
                 )
 
         if result.account is None:
             error_message = result.error_message
         else:
             sync_needed = False
-            for state in snapshot.states:
-                before = original_account_fields.get(state.account_id)
-                if before is None:
-                    continue
+            for before, state in zip(original_account_fields, snapshot.states, strict=True):
                 before_status, before_reason, before_reset_at = before
                 state_reset_at = int(state.reset_at) if state.reset_at is not None else None
                 if (
@@ -506,13 +530,10 @@ class LoadBalancer:
             if sync_needed:
                 try:
                     async with self._repo_factory() as repos:
-                        await self._sync_usage_statuses(repos.accounts, snapshot.account_map, snapshot.states)
+                        await self._sync_usage_statuses(repos.accounts, snapshot.accounts, snapshot.states)
                 except Exception:
                     logger.exception("lb_status_reconcile_failed request_id=%s", get_request_id())
-                    for state in snapshot.states:
-                        account = snapshot.account_map.get(state.account_id)
-                        if account is None:
-                            continue
+                    for account, state in zip(snapshot.accounts, snapshot.states, strict=True):
                         account.status = state.status
                         account.deactivation_reason = state.deactivation_reason
                         account.reset_at = int(state.reset_at) if state.reset_at is not None else None
@@ -526,8 +547,8 @@ class LoadBalancer:
         if selected_snapshot is None:
             return AccountSelection(account=None, error_message=error_message)
 
-        runtime = self._runtime.setdefault(selected_snapshot.id, RuntimeState())
-        runtime.last_selected_at = time.time()
+        runtime = _runtime_for(self._runtime, selected_snapshot.id)
+        runtime.last_selected_at = now
         return AccountSelection(account=selected_snapshot, error_message=None)
 
     def _maybe_log_pinned_fallback(
@@ -539,8 +560,8 @@ class LoadBalancer:
         full_result: SelectionResult,
         sticky_backend: str,
         reallocate_sticky: bool,
+        now: float,
     ) -> None:
-        now = time.time()
         # Avoid writing a log line per request when pinned pool remains unavailable.
         if now - self._last_pinned_fallback_log_at < 10.0:
             return
@@ -622,13 +643,13 @@ class LoadBalancer:
                 latest_primary = _usage_snapshots(latest_primary_orm)
                 latest_secondary = _usage_snapshots(latest_secondary_orm)
 
-                states, account_map = _build_states(
+                states = _build_states(
                     accounts=accounts_orm,
                     latest_primary=latest_primary,
                     latest_secondary=latest_secondary,
                     runtime=self._runtime,
                 )
-                await self._sync_usage_statuses(repos.accounts, account_map, states)
+                await self._sync_usage_statuses(repos.accounts, accounts_orm, states)
                 pinned_raw = await repos.settings.pinned_account_ids()
                 quota_exceeded_ids = {
                     state.account_id for state in states if state.status == AccountStatus.QUOTA_EXCEEDED
@@ -639,9 +660,9 @@ class LoadBalancer:
                     pinned_raw = [account_id for account_id in pinned_raw if account_id not in set(pinned_prune)]
                 self._pinned_settings_cached_ids = tuple(pinned_raw)
                 self._pinned_settings_checked_at = now
-                pinned_account_ids = frozenset(account_id for account_id in pinned_raw if account_id in account_map)
                 accounts = [_clone_account(account) for account in accounts_orm]
                 account_map = {account.id: account for account in accounts}
+                pinned_account_ids = frozenset(account_id for account_id in pinned_raw if account_id in account_map)
 
             snapshot = _Snapshot(
                 accounts=accounts,
@@ -664,12 +685,13 @@ class LoadBalancer:
         sticky_key: str | None,
         reallocate_sticky: bool,
         sticky_repo: StickySessionsRepository | None,
+        now: float,
     ) -> SelectionResult:
         if not sticky_key or not sticky_repo:
-            return select_account(states)
+            return select_account(states, now)
 
         if reallocate_sticky:
-            chosen = select_account(states)
+            chosen = select_account(states, now)
             if chosen.account is not None and chosen.account.account_id in account_map:
                 await sticky_repo.upsert(sticky_key, chosen.account.account_id)
             return chosen
@@ -685,11 +707,11 @@ class LoadBalancer:
                 # typically happens on retry (explicit reallocation) or when the pinned account
                 # becomes unavailable/ineligible. In particular, we do not reassign just because the
                 # selector score would prefer a different account.
-                pinned_result = select_account([pinned])
+                pinned_result = select_account([pinned], now)
                 if pinned_result.account is not None:
                     return pinned_result
 
-        chosen = select_account(states)
+        chosen = select_account(states, now)
         if chosen.account is not None and chosen.account.account_id in account_map:
             await sticky_repo.upsert(sticky_key, chosen.account.account_id)
         return chosen
@@ -701,14 +723,15 @@ class LoadBalancer:
         account_map: dict[str, Account],
         sticky_key: str,
         reallocate_sticky: bool,
+        now: float,
     ) -> SelectionResult:
         if reallocate_sticky:
-            chosen = select_account(states)
+            chosen = select_account(states, now)
             if chosen.account is not None and chosen.account.account_id in account_map:
-                await self._sticky_set(sticky_key, chosen.account.account_id)
+                await self._sticky_set(sticky_key, chosen.account.account_id, now)
             return chosen
 
-        existing = await self._sticky_get(sticky_key)
+        existing = await self._sticky_get(sticky_key, now)
         if existing:
             pinned = next((state for state in states if state.account_id == existing), None)
             if pinned is None:
@@ -719,17 +742,18 @@ class LoadBalancer:
                 # typically happens on retry (explicit reallocation) or when the pinned account
                 # becomes unavailable/ineligible. In particular, we do not reassign just because the
                 # selector score would prefer a different account.
-                pinned_result = select_account([pinned])
+                pinned_result = select_account([pinned], now)
                 if pinned_result.account is not None:
                     return pinned_result
 
-        chosen = select_account(states)
+        chosen = select_account(states, now)
         if chosen.account is not None and chosen.account.account_id in account_map:
-            await self._sticky_set(sticky_key, chosen.account.account_id)
+            await self._sticky_set(sticky_key, chosen.account.account_id, now)
         return chosen
 
     async def mark_rate_limit(self, account: Account, error: UpstreamError) -> None:
-        state = self._state_for(account)
+        runtime = _runtime_for(self._runtime, account.id)
+        state = _state_for(account, runtime)
         handle_rate_limit(state, error)
         logger.info(
             "lb_mark event=rate_limit account=%s[%s] error_count=%s cooldown_until=%s reset_at=%s request_id=%s",
@@ -740,8 +764,7 @@ class LoadBalancer:
             _dt_iso(_dt_from_epoch(state.reset_at)),
             get_request_id(),
         )
-        async with self._repo_factory() as repos:
-            await self._sync_state(repos.accounts, account, state)
+        await self._sync_state(account, state, runtime)
         get_metrics().observe_lb_mark(event="rate_limit", account_id=account.id)
         self._snapshot = None
 
@@ -754,7 +777,8 @@ class LoadBalancer:
             weekly_exhausted = (
                 secondary is not None and float(secondary.used_percent) >= 100.0 and secondary.reset_at is not None
             )
-        state = self._state_for(account)
+        runtime = _runtime_for(self._runtime, account.id)
+        state = _state_for(account, runtime)
         handle_usage_limit_reached(
             state,
             error,
@@ -776,66 +800,46 @@ class LoadBalancer:
             weekly_exhausted,
             get_request_id(),
         )
-        async with self._repo_factory() as repos:
-            await self._sync_state(repos.accounts, account, state)
+        await self._sync_state(account, state, runtime)
         get_metrics().observe_lb_mark(event="usage_limit_reached", account_id=account.id)
         self._snapshot = None
 
     async def mark_quota_exceeded(self, account: Account, error: UpstreamError) -> None:
-        state = self._state_for(account)
+        runtime = _runtime_for(self._runtime, account.id)
+        state = _state_for(account, runtime)
         handle_quota_exceeded(state, error)
+        await self._sync_state(account, state, runtime)
         async with self._repo_factory() as repos:
-            await self._sync_state(repos.accounts, account, state)
             await repos.settings.remove_pinned_account_ids([account.id])
         get_metrics().observe_lb_mark(event="quota_exceeded", account_id=account.id)
         self._snapshot = None
 
     async def mark_permanent_failure(self, account: Account, error_code: str) -> None:
-        state = self._state_for(account)
+        runtime = _runtime_for(self._runtime, account.id)
+        state = _state_for(account, runtime)
         handle_permanent_failure(state, error_code)
-        async with self._repo_factory() as repos:
-            await self._sync_state(repos.accounts, account, state)
+        await self._sync_state(account, state, runtime)
         get_metrics().observe_lb_mark(event="permanent_failure", account_id=account.id)
         get_metrics().observe_lb_permanent_failure(code=error_code)
         self._snapshot = None
 
     async def record_error(self, account: Account) -> None:
-        state = self._state_for(account)
+        runtime = _runtime_for(self._runtime, account.id)
+        state = _state_for(account, runtime)
         state.error_count += 1
         state.last_error_at = time.time()
-        async with self._repo_factory() as repos:
-            await self._sync_state(repos.accounts, account, state)
+        await self._sync_state(account, state, runtime)
         get_metrics().observe_lb_mark(event="error", account_id=account.id)
         self._snapshot = None
 
-    def _state_for(self, account: Account) -> AccountState:
-        runtime = self._runtime.setdefault(account.id, RuntimeState())
-        reset_at = runtime.reset_at
-        if reset_at is None and account.reset_at:
-            reset_at = float(account.reset_at)
-        return AccountState(
-            account_id=account.id,
-            status=account.status,
-            plan_type=account.plan_type,
-            used_percent=None,
-            reset_at=reset_at,
-            cooldown_until=runtime.cooldown_until,
-            secondary_used_percent=None,
-            secondary_reset_at=None,
-            last_error_at=runtime.last_error_at,
-            last_selected_at=runtime.last_selected_at,
-            error_count=runtime.error_count,
-            usage_limit_error_count=runtime.usage_limit_error_count,
-            deactivation_reason=account.deactivation_reason,
-        )
-
     async def _sync_state(
         self,
-        accounts_repo: AccountsRepository,
         account: Account,
         state: AccountState,
+        runtime: RuntimeState,
     ) -> None:
-        runtime = self._runtime.setdefault(account.id, RuntimeState())
+        # Runtime fields are in-memory only; a DB session is opened only when the persisted
+        # status/reason/reset hint actually changed (e.g. `record_error` usually only bumps counters).
         runtime.reset_at = state.reset_at
         runtime.cooldown_until = state.cooldown_until
         runtime.last_error_at = state.last_error_at
@@ -847,28 +851,29 @@ class LoadBalancer:
         reason_changed = account.deactivation_reason != state.deactivation_reason
         reset_changed = account.reset_at != reset_at_int
 
-        if status_changed or reason_changed or reset_changed:
-            await accounts_repo.update_status(
+        if not (status_changed or reason_changed or reset_changed):
+            return
+        async with self._repo_factory() as repos:
+            await repos.accounts.update_status(
                 account.id,
                 state.status,
                 state.deactivation_reason,
                 reset_at_int,
             )
-            account.status = state.status
-            account.deactivation_reason = state.deactivation_reason
-            account.reset_at = reset_at_int
+        invalidate_rate_limit_caches()
+        account.status = state.status
+        account.deactivation_reason = state.deactivation_reason
+        account.reset_at = reset_at_int
 
     async def _sync_usage_statuses(
         self,
         accounts_repo: AccountsRepository,
-        account_map: dict[str, Account],
-        states: Iterable[AccountState],
+        accounts: Sequence[Account],
+        states: Sequence[AccountState],
     ) -> None:
+        # `states` is always built in the same order as `accounts` (see `_build_states`).
         updates: list[AccountStatusUpdate] = []
-        for state in states:
-            account = account_map.get(state.account_id)
-            if not account:
-                continue
+        for account, state in zip(accounts, states, strict=True):
             reset_at_int = int(state.reset_at) if state.reset_at is not None else None
             status_changed = account.status != state.status
             reason_changed = account.deactivation_reason != state.deactivation_reason
@@ -887,9 +892,9 @@ class LoadBalancer:
                 account.reset_at = reset_at_int
         if updates:
             await accounts_repo.bulk_update_status_fields(updates)
+            invalidate_rate_limit_caches()
 
-    async def _sticky_get(self, key: str) -> str | None:
-        now = time.time()
+    async def _sticky_get(self, key: str, now: float) -> str | None:
         async with self._sticky_lock:
             entry = self._sticky_memory.get(key)
             if entry is None:
@@ -900,9 +905,9 @@ class LoadBalancer:
             self._sticky_memory.move_to_end(key)
             return entry.account_id
 
-    async def _sticky_set(self, key: str, account_id: str) -> None:
+    async def _sticky_set(self, key: str, account_id: str, now: float) -> None:
         settings = get_settings()
-        expires_at = time.time() + settings.sticky_sessions_memory_ttl_seconds
+        expires_at = now + settings.sticky_sessions_memory_ttl_seconds
         async with self._sticky_lock:
             self._sticky_memory[key] = _StickyEntry(account_id=account_id, expires_at=expires_at)
             self._sticky_memory.move_to_end(key)
@@ -916,24 +921,51 @@ class LoadBalancer:
 
 def _build_states(
     *,
-    accounts: Iterable[Account],
+    accounts: Sequence[Account],
     latest_primary: dict[str, _UsageSnapshot],
     latest_secondary: dict[str, _UsageSnapshot],
     runtime: dict[str, RuntimeState],
-) -> tuple[list[AccountState], dict[str, Account]]:
-    states: list[AccountState] = []
-    account_map: dict[str, Account] = {}
-
-    for account in accounts:
-        state = _state_from_account(
+) -> list[AccountState]:
+    # The result is index-aligned with `accounts`; callers zip the two instead of looking states up by id.
+    return [
+        _state_from_account(
             account=account,
             primary_entry=latest_primary.get(account.id),
             secondary_entry=latest_secondary.get(account.id),
-            runtime=runtime.setdefault(account.id, RuntimeState()),
+            runtime=_runtime_for(runtime, account.id),
         )
-        states.append(state)
-        account_map[account.id] = account
-    return states, account_map
+        for account in accounts
+    ]
+
+
+def _runtime_for(runtime: dict[str, RuntimeState], account_id: str) -> RuntimeState:
+    # Avoid `dict.setdefault(key, RuntimeState())`, which allocates a throwaway instance on every hit.
+    state = runtime.get(account_id)
+    if state is None:
+        state = RuntimeState()
+        runtime[account_id] = state
+    return state
+
+
+def _state_for(account: Account, runtime: RuntimeState) -> AccountState:
+    reset_at = runtime.reset_at
+    if reset_at is None and account.reset_at:
+        reset_at = float(account.reset_at)
+    return AccountState(
+        account_id=account.id,
+        status=account.status,
+        plan_type=account.plan_type,
+        used_percent=None,
+        reset_at=reset_at,
+        cooldown_until=runtime.cooldown_until,
+        secondary_used_percent=None,
+        secondary_reset_at=None,
+        last_error_at=runtime.last_error_at,
+        last_selected_at=runtime.last_selected_at,
+        error_count=runtime.error_count,
+        usage_limit_error_count=runtime.usage_limit_error_count,
+        deactivation_reason=account.deactivation_reason,
+    )
 
 
 def _state_from_account(
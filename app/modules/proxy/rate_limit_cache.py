@@ -1,45 +1,157 @@
 from __future__ import annotations
 
 import asyncio
+import logging
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Awaitable, Callable
+from typing import Awaitable, Callable, Generic, TypeGuard, TypeVar
 
+from app.core.config.settings import get_settings
 from app.core.utils.time import utcnow
+from app.modules.proxy.types import RateLimitUsageViewData
+
+logger = logging.getLogger(__name__)
+
+# How long past expiry a stale entry may still be served while its replacement is being built.
+_STALE_GRACE_SECONDS = 10
+
+T = TypeVar("T")
 
 
 @dataclass(frozen=True, slots=True)
-class _CacheEntry:
+class _CacheEntry(Generic[T]):
     expires_at: datetime
-    value: dict[str, str]
+    version: int
+    value: T
+    # True when `value` was carried over from the previous entry instead of the latest build.
+    retained: bool = False
+
+
+def _within_stale_grace(entry: _CacheEntry[T] | None, version: int, now: datetime) -> TypeGuard[_CacheEntry[T]]:
+    return (
+        entry is not None
+        and entry.version == version
+        and entry.expires_at + timedelta(seconds=_STALE_GRACE_SECONDS) > now
+    )
+
+
+class SingleFlightCache(Generic[T]):
+    def __init__(self, ttl_seconds: float | None, *, default_ttl: Callable[[], float]) -> None:
+        # `None` calls `default_ttl` (typically a settings lookup) on every store.
+        self._ttl_seconds = ttl_seconds
+        self._default_ttl = default_ttl
+        self._entry: _CacheEntry[T] | None = None
+        self._inflight: asyncio.Task[T] | None = None
+        self._inflight_version = 0
+        self._version = 0
+
+    def invalidate(self) -> None:
+        self._version += 1
+
+    async def get_or_build(self, build: Callable[[], Awaitable[T]]) -> T:
+        version = self._version
+        now = utcnow()
+        entry = self._entry
+        if entry is not None and entry.version == version and entry.expires_at > now:
+            return entry.value
+
+        # Concurrent misses share a single in-flight build instead of queueing behind a lock. Reading and
+        # assigning `_inflight` happens without an intervening await, so it is atomic on the event loop.
+        # The build runs in its own task so a cancelled caller does not abort it for the other waiters.
+        inflight = self._inflight
+        if inflight is not None and self._inflight_version == version:
+            # Serve the previous value while the refresh runs rather than parking every caller on it.
+            if entry is not None and entry.expires_at + timedelta(seconds=_STALE_GRACE_SECONDS) > now:
+                return entry.value
+            return await self._await_build(inflight, entry, version)
+
+        inflight = asyncio.ensure_future(self._build_and_store(build, version))
+        inflight.add_done_callback(self._clear_inflight)
+        self._inflight = inflight
+        self._inflight_version = version
+        return await self._await_build(inflight, entry, version)
+
+    async def _await_build(self, inflight: asyncio.Task[T], entry: _CacheEntry[T] | None, version: int) -> T:
+        try:
+            return await asyncio.shield(inflight)
+        except Exception:
+            # A failed rebuild (e.g. the database is briefly unavailable) falls back to the previous value under
+            # the same stale bound as in-flight reads. An invalidated or older entry is not served.
+            if _within_stale_grace(entry, version, utcnow()):
+                return entry.value
+            raise
 
+    async def _build_and_store(self, build: Callable[[], Awaitable[T]], version: int) -> T:
+        # A failed or cancelled build is never cached; waiters fall back to the previous entry, if any.
+        try:
+            value = await build()
+        except Exception:
+            logger.warning("Rate limit cache rebuild failed", exc_info=True)
+            raise
+        current = self._entry
+        if current is not None and current.version > version:
+            return value
+        expires_at = utcnow() + timedelta(seconds=self._ttl())
+        # Carry-over only applies to a plain TTL refresh: a build that follows an invalidation is authoritative.
+        # Only one carry-over is allowed, so a persistent change still shows up on the following rebuild.
+        if current is not None and current.version == version and not current.retained:
+            carried = self._carry_over(current.value, value)
+            if carried is not None:
+                self._entry = _CacheEntry(expires_at=expires_at, version=version, value=carried, retained=True)
+                return carried
+        # A build that raced an invalidation keeps its old version, so the next read rebuilds.
+        self._entry = _CacheEntry(expires_at=expires_at, version=version, value=value)
+        return value
+
+    def _carry_over(self, current: T, built: T) -> T | None:
+        # The value to serve for one more TTL instead of `built`, or `None` to store `built` as is.
+        return None
+
+    def _clear_inflight(self, task: asyncio.Task[T]) -> None:
+        if self._inflight is task:
+            self._inflight = None
+
+    def _ttl(self) -> float:
+        if self._ttl_seconds is not None:
+            return self._ttl_seconds
+        return self._default_ttl()
+
+
+class RateLimitHeaderCache(SingleFlightCache[dict[str, str]]):
+    def __init__(self, ttl_seconds: float | None = None) -> None:
+        super().__init__(ttl_seconds, default_ttl=lambda: get_settings().rate_limit_headers_cache_ttl_seconds)
+
+    def _carry_over(self, current: dict[str, str], built: dict[str, str]) -> dict[str, str] | None:
+        # A build that lost header groups the previous entry had (e.g. a window with no samples while usage
+        # refresh is catching up) keeps those groups for one more TTL; freshly built values still win.
+        if built.keys() >= current.keys():
+            return None
+        return {**current, **built}
 
-_LOCK = asyncio.Lock()
-_ENTRY: _CacheEntry | None = None
-_TTL_SECONDS = 10
 
+class RateLimitPayloadCache(SingleFlightCache[RateLimitUsageViewData | None]):
+    def __init__(self, ttl_seconds: float | None = None) -> None:
+        super().__init__(ttl_seconds, default_ttl=lambda: get_settings().rate_limit_payload_cache_ttl_seconds)
 
-def invalidate_rate_limit_headers_cache() -> None:
-    global _ENTRY
-    _ENTRY = None
+
+_DEFAULT = RateLimitHeaderCache()
+_PAYLOAD = RateLimitPayloadCache()
+
+
+def invalidate_rate_limit_caches() -> None:
+    # Both the response headers and the usage view are derived from usage rows and the account list, so a
+    # write to either invalidates them together.
+    _DEFAULT.invalidate()
+    _PAYLOAD.invalidate()
 
 
 async def get_or_build_rate_limit_headers(
     build: Callable[[], Awaitable[dict[str, str]]],
 ) -> dict[str, str]:
-    global _ENTRY
+    return await _DEFAULT.get_or_build(build)
 
-    now = utcnow()
-    entry = _ENTRY
-    if entry is not None and entry.expires_at > now:
-        return entry.value
 
-    async with _LOCK:
-        now = utcnow()
-        entry = _ENTRY
-        if entry is not None and entry.expires_at > now:
-            return entry.value
-
-        value = await build()
-        _ENTRY = _CacheEntry(expires_at=utcnow() + timedelta(seconds=_TTL_SECONDS), value=value)
-        return value
+async def get_or_build_rate_limit_usage_view(
+    build: Callable[[], Awaitable[RateLimitUsageViewData | None]],
+) -> RateLimitUsageViewData | None:
+    return await _PAYLOAD.get_or_build(build)
@@ -11,7 +11,7 @@ from app.modules.settings.repository import SettingsRepository
 from app.modules.usage.repository import UsageRepository
 
 
-@dataclass(slots=True)
+@dataclass(slots=True, eq=False)
 class ProxyRepositories:
     accounts: AccountsRepository
     usage: UsageRepository
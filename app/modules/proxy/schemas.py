@@ -22,7 +22,8 @@ class RateLimitWindowSnapshot(BaseModel):
 
     @classmethod
     def from_data(cls, data: RateLimitWindowSnapshotData) -> "RateLimitWindowSnapshot":
-        return cls(
+        # `*Data` inputs are typed dataclasses built by the service layer, so skip re-validation.
+        return cls.model_construct(
             used_percent=data.used_percent,
             limit_window_seconds=data.limit_window_seconds,
             reset_after_seconds=data.reset_after_seconds,
@@ -40,7 +41,7 @@ class RateLimitStatusDetails(BaseModel):
 
     @classmethod
     def from_data(cls, data: RateLimitStatusDetailsData) -> "RateLimitStatusDetails":
-        return cls(
+        return cls.model_construct(
             allowed=data.allowed,
             limit_reached=data.limit_reached,
             primary_window=RateLimitWindowSnapshot.from_data(data.primary_window) if data.primary_window else None,
@@ -61,7 +62,7 @@ class CreditStatusDetails(BaseModel):
 
     @classmethod
     def from_data(cls, data: CreditStatusDetailsData) -> "CreditStatusDetails":
-        return cls(
+        return cls.model_construct(
             has_credits=data.has_credits,
             unlimited=data.unlimited,
             balance=data.balance,
@@ -79,7 +80,7 @@ class RateLimitStatusPayload(BaseModel):
 
     @classmethod
     def from_data(cls, data: RateLimitStatusPayloadData) -> "RateLimitStatusPayload":
-        return cls(
+        return cls.model_construct(
             plan_type=data.plan_type,
             rate_limit=RateLimitStatusDetails.from_data(data.rate_limit) if data.rate_limit else None,
             credits=CreditStatusDetails.from_data(data.credits) if data.credits else None,
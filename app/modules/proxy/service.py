@@ -1,13 +1,16 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import re
 import time
+from collections import Counter, OrderedDict
 from collections.abc import Sequence
 from dataclasses import dataclass
 from datetime import timedelta
-from hashlib import sha256
+from functools import partial
+from hashlib import blake2b
 from typing import AsyncIterator, Mapping
 
 import anyio
@@ -24,8 +27,8 @@ from app.core.crypto import TokenEncryptor, get_or_create_key
 from app.core.errors import openai_error, response_failed_event
 from app.core.metrics import get_metrics
 from app.core.metrics.metrics import ProxyRequestObservation
-from app.core.openai.models import OpenAIEvent, OpenAIResponsePayload
-from app.core.openai.parsing import parse_sse_event
+from app.core.openai.models import OpenAIResponsePayload, ResponseUsage
+from app.core.openai.parsing import event_type_of, parse_event_payload
 from app.core.openai.requests import ResponsesCompactRequest, ResponsesRequest
 from app.core.request_logs.buffer import RequestLogCreate, enqueue_request_log
 from app.core.types import JsonValue
@@ -40,8 +43,8 @@ from app.modules.proxy.helpers import (
     _apply_error_metadata,
     _credits_headers,
     _credits_snapshot,
+    _error_code_from_openai,
     _header_account_id,
-    _normalize_error_code,
     _parse_openai_error,
     _plan_type_for_accounts,
     _rate_limit_details,
@@ -52,14 +55,49 @@ from app.modules.proxy.helpers import (
     _window_snapshot,
 )
 from app.modules.proxy.load_balancer import LoadBalancer, LoadBalancerDebugDump, LoadBalancerSelectionEvent
-from app.modules.proxy.rate_limit_cache import get_or_build_rate_limit_headers
-from app.modules.proxy.repo_bundle import ProxyRepoFactory, ProxyRepositories
-from app.modules.proxy.types import RateLimitStatusPayloadData
+from app.modules.proxy.rate_limit_cache import get_or_build_rate_limit_headers, get_or_build_rate_limit_usage_view
+from app.modules.proxy.repo_bundle import ProxyRepoFactory
+from app.modules.proxy.types import RateLimitStatusPayloadData, RateLimitUsageViewData
 
 logger = logging.getLogger(__name__)
 
 _TEXT_DELTA_EVENT_TYPES = frozenset({"response.output_text.delta", "response.refusal.delta"})
 _TEXT_DONE_CONTENT_PART_TYPES = frozenset({"output_text", "refusal"})
+_FAILURE_EVENT_TYPES = frozenset({"response.failed", "error"})
+_COMPLETION_EVENT_TYPES = frozenset({"response.completed", "response.incomplete"})
+_TRACKED_EVENT_TYPES = _FAILURE_EVENT_TYPES | _COMPLETION_EVENT_TYPES
+# Inbound headers whose presence (not value) is reported by the request shape log.
+_INTERESTING_HEADER_KEYS = frozenset(
+    {
+        "user-agent",
+        "x-request-id",
+        "request-id",
+        "x-openai-client-id",
+        "x-openai-client-version",
+        "x-openai-client-arch",
+        "x-openai-client-os",
+        "x-openai-client-user-agent",
+        "x-codex-session-id",
+        "x-codex-conversation-id",
+    }
+)
+# Reused for payload logging; `json.dumps` with non-default options builds a new encoder per call.
+_LOG_JSON_ENCODER = json.JSONEncoder(ensure_ascii=True, separators=(",", ":"))
+# Upstream error codes that make the proxy retry the request on another account.
+_RETRYABLE_ERROR_CODES = frozenset(
+    {
+        "rate_limit_exceeded",
+        "usage_limit_reached",
+        "insufficient_quota",
+        "usage_not_included",
+        "quota_exceeded",
+    }
+)
+
+# Decrypted access tokens are kept briefly so retries and back-to-back requests on the same account
+# skip the Fernet decrypt. Entries are keyed by ciphertext, so a token refresh simply misses.
+_ACCESS_TOKEN_CACHE_MAXSIZE = 256
+_ACCESS_TOKEN_CACHE_TTL_SECONDS = 300.0
 
 _CODEX_SESSION_ID_FALLBACK_RE = re.compile(
     r"^[0-9a-fA-F]{8}-"
@@ -70,6 +108,18 @@ _CODEX_SESSION_ID_FALLBACK_RE = re.compile(
 )
 
 
+@dataclass(frozen=True, slots=True)
+class _CachedAccessToken:
+    token: str
+    expires_at: float
+
+
+@dataclass(frozen=True, slots=True)
+class _InflightRefresh:
+    task: asyncio.Task[Account]
+    force: bool
+
+
 @dataclass(frozen=True, slots=True)
 class ProbeResult:
     ok: bool
@@ -106,6 +156,8 @@ class ProxyService:
         self._repo_factory = repo_factory
         self._encryptor = TokenEncryptor()
         self._load_balancer = LoadBalancer(repo_factory)
+        self._access_tokens: OrderedDict[bytes, _CachedAccessToken] = OrderedDict()
+        self._refresh_inflight: dict[str, _InflightRefresh] = {}
 
     def invalidate_routing_snapshot(self) -> None:
         self._load_balancer.invalidate_snapshot()
@@ -178,7 +230,7 @@ class ProxyService:
             )
 
         async def _call_probe(target: Account) -> OpenAIResponsePayload:
-            access_token = self._encryptor.decrypt(target.access_token_encrypted)
+            access_token = self._access_token(target)
             upstream_account_id = _header_account_id(target.chatgpt_account_id)
             payload = ResponsesCompactRequest(
                 model=normalized_model,
@@ -192,7 +244,7 @@ class ProxyService:
             response = await _call_probe(account)
         except ProxyResponseError as exc:
             error = _parse_openai_error(exc.payload)
-            normalized_code = _normalize_error_code(error.code if error else None, error.type if error else None)
+            normalized_code = _error_code_from_openai(error)
             resets_at = int(error.resets_at) if error and error.resets_at is not None else None
             resets_in = float(error.resets_in_seconds) if error and error.resets_in_seconds is not None else None
             return ProbeResult(
@@ -207,7 +259,7 @@ class ProxyService:
 
         if response.status == "failed" or response.error is not None:
             error = response.error
-            normalized_code = _normalize_error_code(error.code if error else None, error.type if error else None)
+            normalized_code = _error_code_from_openai(error)
             resets_at = int(error.resets_at) if error and error.resets_at is not None else None
             resets_in = float(error.resets_in_seconds) if error and error.resets_in_seconds is not None else None
             return ProbeResult(
@@ -238,17 +290,10 @@ class ProxyService:
         # Codex diagnostic headers are best-effort and can be frequently absent in practice (even for Codex CLI).
         # When `x-codex-session-id` is missing, we fall back to treating a UUID-shaped `prompt_cache_key`
         # as the effective session id for request-log correlation.
-        codex_session_id = self._optional_header_value(filtered, "x-codex-session-id") or _fallback_codex_session_id(
-            sticky_key
+        codex_session_id, codex_conversation_id = self._optional_header_values(
+            filtered, "x-codex-session-id", "x-codex-conversation-id"
         )
-        codex_conversation_id = self._optional_header_value(filtered, "x-codex-conversation-id")
-        retryable_codes = {
-            "rate_limit_exceeded",
-            "usage_limit_reached",
-            "insufficient_quota",
-            "usage_not_included",
-            "quota_exceeded",
-        }
+        codex_session_id = codex_session_id or _fallback_codex_session_id(sticky_key)
         # Fail over across multiple accounts, but keep the bound small to avoid long tail latency
         # when upstream is broadly unavailable/limited across many accounts.
         max_attempts = 1 if forced_account_id else 3
@@ -267,33 +312,34 @@ class ProxyService:
             cached_input_tokens: int | None,
             reasoning_tokens: int | None,
         ) -> None:
-            with anyio.CancelScope(shield=True):
-                if get_settings().request_logs_buffer_enabled:
-                    enqueue_request_log(
-                        RequestLogCreate(
-                            account_id=account_id,
-                            request_id=request_id,
-                            model=model,
-                            input_tokens=input_tokens,
-                            output_tokens=output_tokens,
-                            cached_input_tokens=cached_input_tokens,
-                            reasoning_tokens=reasoning_tokens,
-                            reasoning_effort=None,
-                            latency_ms=latency_ms,
-                            status=status,
-                            error_code=error_code,
-                            error_message=error_message,
-                            prompt_cache_key_hash=prompt_cache_key_hash,
-                            codex_session_id=codex_session_id,
-                            codex_conversation_id=codex_conversation_id,
-                            # Note: this timestamp is when codex-lb persists the request log (effectively "request
-                            # finished" time), not when the upstream request started. When debugging apparent
-                            # "success after error" sequences, consider `latency_ms` to approximate start times.
-                            requested_at=utcnow(),
-                        )
+            if get_settings().request_logs_buffer_enabled:
+                enqueue_request_log(
+                    RequestLogCreate(
+                        account_id=account_id,
+                        request_id=request_id,
+                        model=model,
+                        input_tokens=input_tokens,
+                        output_tokens=output_tokens,
+                        cached_input_tokens=cached_input_tokens,
+                        reasoning_tokens=reasoning_tokens,
+                        reasoning_effort=None,
+                        latency_ms=latency_ms,
+                        status=status,
+                        error_code=error_code,
+                        error_message=error_message,
+                        prompt_cache_key_hash=prompt_cache_key_hash,
+                        codex_session_id=codex_session_id,
+                        codex_conversation_id=codex_conversation_id,
+                        # Note: this timestamp is when codex-lb persists the request log (effectively "request
+                        # finished" time), not when the upstream request started. When debugging apparent
+                        # "success after error" sequences, consider `latency_ms` to approximate start times.
+                        requested_at=utcnow(),
                     )
-                    return
+                )
+                return
 
+            # Only the direct write awaits, so only it needs shielding from the caller's cancellation.
+            with anyio.CancelScope(shield=True):
                 async with self._repo_factory() as repos:
                     await repos.request_logs.add_log(
                         account_id=account_id,
@@ -317,8 +363,63 @@ class ProxyService:
                         requested_at=utcnow(),
                     )
 
+        async def _record_attempt(
+            account_id: str,
+            start_ns: int,
+            *,
+            response: OpenAIResponsePayload | None = None,
+            error_code: str | None = None,
+            error_message: str | None = None,
+        ) -> None:
+            # Shared metrics + request-log bookkeeping for every way a compact attempt can finish. A returned
+            # payload is classified from its own status/error; otherwise the caller passes the error code.
+            latency_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+            status = "success" if error_code is None else "error"
+            usage = None
+            if response is not None:
+                if response.status == "failed" or response.error is not None:
+                    status = "error"
+                    error_code = _error_code_from_openai(response.error)
+                    error_message = response.error.message if response.error else None
+                usage = response.usage
+            input_tokens, output_tokens, cached_input_tokens, reasoning_tokens = _usage_token_counts(usage)
+            get_metrics().observe_proxy_request(
+                ProxyRequestObservation(
+                    account_id=account_id,
+                    api="responses_compact",
+                    status=status,
+                    model=payload.model,
+                    latency_ms=latency_ms,
+                    input_tokens=input_tokens,
+                    output_tokens=output_tokens,
+                    cached_input_tokens=cached_input_tokens,
+                    reasoning_tokens=reasoning_tokens,
+                    error_code=error_code,
+                )
+            )
+            try:
+                await _persist_request_log(
+                    account_id=account_id,
+                    model=payload.model,
+                    latency_ms=latency_ms,
+                    status=status,
+                    error_code=error_code,
+                    error_message=error_message,
+                    input_tokens=input_tokens,
+                    output_tokens=output_tokens,
+                    cached_input_tokens=cached_input_tokens,
+                    reasoning_tokens=reasoning_tokens,
+                )
+            except Exception:
+                logger.warning(
+                    "Failed to persist request log account_id=%s request_id=%s",
+                    account_id,
+                    request_id,
+                    exc_info=True,
+                )
+
         for attempt in range(max_attempts):
-            start = time.monotonic()
+            start_ns = time.perf_counter_ns()
             if forced_account_id:
                 selection = await self._load_balancer.select_forced_account(forced_account_id)
             else:
@@ -344,267 +445,61 @@ class ProxyService:
                     openai_error("no_accounts", selection.error_message or "No active accounts available"),
                 )
 
-            async def _call_compact(target: Account) -> OpenAIResponsePayload:
-                access_token = self._encryptor.decrypt(target.access_token_encrypted)
-                account_id = _header_account_id(target.chatgpt_account_id)
-                return await core_compact_responses(payload, filtered, access_token, account_id)
-
-            try:
-                account = await self._ensure_fresh_if_needed(account)
-                response = await _call_compact(account)
-                latency_ms = int((time.monotonic() - start) * 1000)
-                usage = response.usage
-                input_tokens = usage.input_tokens if usage else None
-                output_tokens = usage.output_tokens if usage else None
-                cached_input_tokens = (
-                    usage.input_tokens_details.cached_tokens if usage and usage.input_tokens_details else None
-                )
-                reasoning_tokens = (
-                    usage.output_tokens_details.reasoning_tokens if usage and usage.output_tokens_details else None
-                )
-                status = "success"
-                error_code = None
-                if response.status == "failed" or response.error is not None:
-                    status = "error"
-                    error = response.error
-                    error_code = _normalize_error_code(
-                        error.code if error else None,
-                        error.type if error else None,
-                    )
-                get_metrics().observe_proxy_request(
-                    ProxyRequestObservation(
-                        account_id=account.id,
-                        api="responses_compact",
-                        status=status,
-                        model=payload.model,
-                        latency_ms=latency_ms,
-                        input_tokens=input_tokens,
-                        output_tokens=output_tokens,
-                        cached_input_tokens=cached_input_tokens,
-                        reasoning_tokens=reasoning_tokens,
-                        error_code=error_code,
-                    )
-                )
+            # A 401 is retried once on the same account with a force-refreshed token. That retry shares
+            # this attempt's bookkeeping below and does not use up a failover attempt. An upstream error on
+            # the retry is raised to the client without failing over to another account.
+            refreshed = False
+            while True:
                 try:
-                    await _persist_request_log(
-                        account_id=account.id,
-                        model=payload.model,
-                        latency_ms=latency_ms,
-                        status=status,
-                        error_code=error_code,
-                        error_message=response.error.message if response.error else None,
-                        input_tokens=input_tokens,
-                        output_tokens=output_tokens,
-                        cached_input_tokens=cached_input_tokens,
-                        reasoning_tokens=reasoning_tokens,
-                    )
-                except Exception:
-                    logger.warning(
-                        "Failed to persist request log account_id=%s request_id=%s",
-                        account.id,
-                        request_id,
-                        exc_info=True,
+                    if not refreshed:
+                        account = await self._ensure_fresh_if_needed(account)
+                    response = await core_compact_responses(
+                        payload,
+                        filtered,
+                        self._access_token(account),
+                        _header_account_id(account.chatgpt_account_id),
                     )
-                return response
-            except ProxyResponseError as exc:
-                if exc.status_code == 401:
-                    try:
-                        account = await self._ensure_fresh(account, force=True)
-                    except RefreshError as refresh_exc:
-                        if refresh_exc.is_permanent:
-                            await self._load_balancer.mark_permanent_failure(account, refresh_exc.code)
-                        latency_ms = int((time.monotonic() - start) * 1000)
-                        get_metrics().observe_proxy_request(
-                            ProxyRequestObservation(
-                                account_id=account.id,
-                                api="responses_compact",
-                                status="error",
-                                model=payload.model,
-                                latency_ms=latency_ms,
-                                input_tokens=None,
-                                output_tokens=None,
-                                cached_input_tokens=None,
-                                reasoning_tokens=None,
-                                error_code="auth_refresh_failed",
-                            )
-                        )
+                    await _record_attempt(account.id, start_ns, response=response)
+                    return response
+                except ProxyResponseError as exc:
+                    if exc.status_code == 401 and not refreshed:
+                        refreshed = True
                         try:
-                            await _persist_request_log(
-                                account_id=account.id,
-                                model=payload.model,
-                                latency_ms=latency_ms,
-                                status="error",
+                            account = await self._ensure_fresh(account, force=True)
+                        except RefreshError as refresh_exc:
+                            if refresh_exc.is_permanent:
+                                await self._load_balancer.mark_permanent_failure(account, refresh_exc.code)
+                            await _record_attempt(
+                                account.id,
+                                start_ns,
                                 error_code="auth_refresh_failed",
                                 error_message=str(refresh_exc),
-                                input_tokens=None,
-                                output_tokens=None,
-                                cached_input_tokens=None,
-                                reasoning_tokens=None,
-                            )
-                        except Exception:
-                            logger.warning(
-                                "Failed to persist request log account_id=%s request_id=%s",
-                                account.id,
-                                request_id,
-                                exc_info=True,
-                            )
-                        raise exc
-                    try:
-                        response = await _call_compact(account)
-                        latency_ms = int((time.monotonic() - start) * 1000)
-                        usage = response.usage
-                        input_tokens = usage.input_tokens if usage else None
-                        output_tokens = usage.output_tokens if usage else None
-                        cached_input_tokens = (
-                            usage.input_tokens_details.cached_tokens if usage and usage.input_tokens_details else None
-                        )
-                        reasoning_tokens = (
-                            usage.output_tokens_details.reasoning_tokens
-                            if usage and usage.output_tokens_details
-                            else None
-                        )
-                        status = "success"
-                        error_code = None
-                        if response.status == "failed" or response.error is not None:
-                            status = "error"
-                            error = response.error
-                            error_code = _normalize_error_code(
-                                error.code if error else None,
-                                error.type if error else None,
-                            )
-                        get_metrics().observe_proxy_request(
-                            ProxyRequestObservation(
-                                account_id=account.id,
-                                api="responses_compact",
-                                status=status,
-                                model=payload.model,
-                                latency_ms=latency_ms,
-                                input_tokens=input_tokens,
-                                output_tokens=output_tokens,
-                                cached_input_tokens=cached_input_tokens,
-                                reasoning_tokens=reasoning_tokens,
-                                error_code=error_code,
                             )
-                        )
-                        try:
-                            await _persist_request_log(
-                                account_id=account.id,
-                                model=payload.model,
-                                latency_ms=latency_ms,
-                                status=status,
-                                error_code=error_code,
-                                error_message=response.error.message if response.error else None,
-                                input_tokens=input_tokens,
-                                output_tokens=output_tokens,
-                                cached_input_tokens=cached_input_tokens,
-                                reasoning_tokens=reasoning_tokens,
-                            )
-                        except Exception:
-                            logger.warning(
-                                "Failed to persist request log account_id=%s request_id=%s",
-                                account.id,
-                                request_id,
-                                exc_info=True,
-                            )
-                        return response
-                    except ProxyResponseError as exc:
-                        await self._handle_proxy_error(account, exc)
-                        error = _parse_openai_error(exc.payload)
-                        code = _normalize_error_code(
-                            error.code if error else None,
-                            error.type if error else None,
-                        )
-                        latency_ms = int((time.monotonic() - start) * 1000)
-                        get_metrics().observe_proxy_request(
-                            ProxyRequestObservation(
-                                account_id=account.id,
-                                api="responses_compact",
-                                status="error",
-                                model=payload.model,
-                                latency_ms=latency_ms,
-                                input_tokens=None,
-                                output_tokens=None,
-                                cached_input_tokens=None,
-                                reasoning_tokens=None,
-                                error_code=code,
-                            )
-                        )
-                        try:
-                            await _persist_request_log(
-                                account_id=account.id,
-                                model=payload.model,
-                                latency_ms=latency_ms,
-                                status="error",
-                                error_code=code,
-                                error_message=error.message if error else None,
-                                input_tokens=None,
-                                output_tokens=None,
-                                cached_input_tokens=None,
-                                reasoning_tokens=None,
-                            )
-                        except Exception:
-                            logger.warning(
-                                "Failed to persist request log account_id=%s request_id=%s",
-                                account.id,
-                                request_id,
-                                exc_info=True,
-                            )
-                        raise
+                            raise exc
+                        continue
 
-                error = _parse_openai_error(exc.payload)
-                code = _normalize_error_code(
-                    error.code if error else None,
-                    error.type if error else None,
-                )
-                await self._handle_stream_error(account, _upstream_error_from_openai(error), code)
-                latency_ms = int((time.monotonic() - start) * 1000)
-                get_metrics().observe_proxy_request(
-                    ProxyRequestObservation(
-                        account_id=account.id,
-                        api="responses_compact",
-                        status="error",
-                        model=payload.model,
-                        latency_ms=latency_ms,
-                        input_tokens=None,
-                        output_tokens=None,
-                        cached_input_tokens=None,
-                        reasoning_tokens=None,
-                        error_code=code,
-                    )
-                )
-                try:
-                    await _persist_request_log(
-                        account_id=account.id,
-                        model=payload.model,
-                        latency_ms=latency_ms,
-                        status="error",
-                        error_code=code,
-                        error_message=error.message if error else None,
-                        input_tokens=None,
-                        output_tokens=None,
-                        cached_input_tokens=None,
-                        reasoning_tokens=None,
-                    )
-                except Exception:
-                    logger.warning(
-                        "Failed to persist request log account_id=%s request_id=%s",
+                    error = _parse_openai_error(exc.payload)
+                    code = _error_code_from_openai(error)
+                    await self._handle_stream_error(account, _upstream_error_from_openai(error), code)
+                    await _record_attempt(
                         account.id,
-                        request_id,
-                        exc_info=True,
-                    )
-                if code in retryable_codes and attempt < (max_attempts - 1):
-                    get_metrics().observe_proxy_retry(
-                        api="responses_compact",
+                        start_ns,
                         error_code=code,
-                        account_id=account.id,
+                        error_message=error.message if error else None,
                     )
-                    last_retryable_error = exc
-                    continue
-                raise
-            except RefreshError as exc:
-                if exc.is_permanent:
-                    await self._load_balancer.mark_permanent_failure(account, exc.code)
-                continue
+                    if not refreshed and code in _RETRYABLE_ERROR_CODES and attempt < (max_attempts - 1):
+                        get_metrics().observe_proxy_retry(
+                            api="responses_compact",
+                            error_code=code,
+                            account_id=account.id,
+                        )
+                        last_retryable_error = exc
+                        break
+                    raise
+                except RefreshError as exc:
+                    if exc.is_permanent:
+                        await self._load_balancer.mark_permanent_failure(account, exc.code)
+                    break
 
         if last_retryable_error is not None:
             raise last_retryable_error
@@ -621,7 +516,7 @@ class ProxyService:
                 accounts = await repos.accounts.list_accounts()
                 account_map = {account.id: account for account in accounts}
 
-                primary_minutes = await repos.usage.latest_window_minutes("primary")
+                primary_minutes, secondary_minutes = await repos.usage.latest_primary_secondary_window_minutes()
                 if primary_minutes is None:
                     primary_minutes = usage_core.default_window_minutes("primary")
                 if primary_minutes:
@@ -631,13 +526,12 @@ class ProxyService:
                     )
                     if primary_rows:
                         summary = usage_core.summarize_usage_window(
-                            [row.to_window_row() for row in primary_rows],
+                            (row.to_window_row() for row in primary_rows),
                             account_map,
                             "primary",
                         )
                         headers.update(_rate_limit_headers("primary", summary))
 
-                secondary_minutes = await repos.usage.latest_window_minutes("secondary")
                 if secondary_minutes is None:
                     secondary_minutes = usage_core.default_window_minutes("secondary")
                 if secondary_minutes:
@@ -647,7 +541,7 @@ class ProxyService:
                     )
                     if secondary_rows:
                         summary = usage_core.summarize_usage_window(
-                            [row.to_window_row() for row in secondary_rows],
+                            (row.to_window_row() for row in secondary_rows),
                             account_map,
                             "secondary",
                         )
@@ -660,27 +554,41 @@ class ProxyService:
         return await get_or_build_rate_limit_headers(_build)
 
     async def get_rate_limit_payload(self) -> RateLimitStatusPayloadData:
+        view = await get_or_build_rate_limit_usage_view(self._build_rate_limit_usage_view)
+        if view is None:
+            return RateLimitStatusPayloadData(plan_type="guest")
+
+        now_epoch = int(time.time())
+        primary_window = _window_snapshot(view.primary_summary, view.primary_rows, "primary", now_epoch)
+        secondary_window = _window_snapshot(view.secondary_summary, view.secondary_rows, "secondary", now_epoch)
+        return RateLimitStatusPayloadData(
+            plan_type=view.plan_type,
+            rate_limit=_rate_limit_details(primary_window, secondary_window),
+            credits=view.credits,
+        )
+
+    async def _build_rate_limit_usage_view(self) -> RateLimitUsageViewData | None:
         async with self._repo_factory() as repos:
             accounts = await repos.accounts.list_accounts()
             selected_accounts = _select_accounts_for_limits(accounts)
             if not selected_accounts:
-                return RateLimitStatusPayloadData(plan_type="guest")
+                return None
 
             account_map = {account.id: account for account in selected_accounts}
-            primary_rows = await self._latest_usage_rows(repos, account_map, "primary")
-            secondary_rows = await self._latest_usage_rows(repos, account_map, "secondary")
-
-            primary_summary = _summarize_window(primary_rows, account_map, "primary")
-            secondary_summary = _summarize_window(secondary_rows, account_map, "secondary")
-
-            now_epoch = int(time.time())
-            primary_window = _window_snapshot(primary_summary, primary_rows, "primary", now_epoch)
-            secondary_window = _window_snapshot(secondary_summary, secondary_rows, "secondary", now_epoch)
+            latest_primary, latest_secondary = await repos.usage.latest_primary_secondary_by_account()
+            primary_rows = _usage_window_rows(latest_primary, account_map)
+            secondary_rows = _usage_window_rows(latest_secondary, account_map)
 
-            return RateLimitStatusPayloadData(
+            return RateLimitUsageViewData(
                 plan_type=_plan_type_for_accounts(selected_accounts),
-                rate_limit=_rate_limit_details(primary_window, secondary_window),
-                credits=_credits_snapshot(await self._latest_usage_entries(repos, account_map)),
+                primary_summary=_summarize_window(primary_rows, account_map, "primary"),
+                primary_rows=primary_rows,
+                secondary_summary=_summarize_window(secondary_rows, account_map, "secondary"),
+                secondary_rows=secondary_rows,
+                # Credits are reported on primary-window rows, matching `latest_by_account()`'s default.
+                credits=_credits_snapshot(
+                    [entry for entry in latest_primary.values() if entry.account_id in account_map]
+                ),
             )
 
     async def _stream_with_retry(
@@ -696,13 +604,6 @@ class ProxyService:
         request_id = ensure_request_id()
         sticky_key = _sticky_key_from_payload(payload)
         prompt_cache_key_hash = _maybe_prompt_cache_key_hash(sticky_key)
-        retryable_codes = {
-            "rate_limit_exceeded",
-            "usage_limit_reached",
-            "insufficient_quota",
-            "usage_not_included",
-            "quota_exceeded",
-        }
         emitted_any = False
         # Account failover happens inside this loop. When upstream errors are marked retryable and
         # we haven't emitted any SSE output yet, we re-select an account (`reallocate_sticky=True`)
@@ -784,7 +685,7 @@ class ProxyService:
                         yield line
                     return
                 error = _parse_openai_error(exc.payload)
-                error_code = _normalize_error_code(error.code if error else None, error.type if error else None)
+                error_code = _error_code_from_openai(error)
                 error_message = error.message if error else None
                 error_type = error.type if error else None
                 error_param = error.param if error else None
@@ -793,7 +694,7 @@ class ProxyService:
                     _upstream_error_from_openai(error),
                     error_code,
                 )
-                if not emitted_any and error_code in retryable_codes and attempt < (max_attempts - 1):
+                if not emitted_any and error_code in _RETRYABLE_ERROR_CODES and attempt < (max_attempts - 1):
                     get_metrics().observe_proxy_retry(
                         api=api,
                         error_code=error_code,
@@ -855,19 +756,19 @@ class ProxyService:
         suppress_text_done_events: bool,
     ) -> AsyncIterator[str]:
         account_id_value = account.id
-        access_token = self._encryptor.decrypt(account.access_token_encrypted)
+        access_token = self._access_token(account)
         account_id = _header_account_id(account.chatgpt_account_id)
         sticky_key = _sticky_key_from_payload(payload)
         # Codex diagnostic headers are best-effort and can be frequently absent in practice (even for Codex CLI).
         # When `x-codex-session-id` is missing, we fall back to treating a UUID-shaped `prompt_cache_key`
         # as the effective session id for request-log correlation.
-        codex_session_id = self._optional_header_value(headers, "x-codex-session-id") or _fallback_codex_session_id(
-            sticky_key
+        codex_session_id, codex_conversation_id = self._optional_header_values(
+            headers, "x-codex-session-id", "x-codex-conversation-id"
         )
-        codex_conversation_id = self._optional_header_value(headers, "x-codex-conversation-id")
+        codex_session_id = codex_session_id or _fallback_codex_session_id(sticky_key)
         model = payload.model
         reasoning_effort = payload.reasoning.effort if payload.reasoning else None
-        start = time.monotonic()
+        start_ns = time.perf_counter_ns()
         status = "success"
         error_code = None
         error_message = None
@@ -888,18 +789,15 @@ class ProxyService:
             except StopAsyncIteration:
                 return
             first_payload = parse_sse_data_json(first)
-            event = parse_sse_event(first)
-            event_type = _event_type_from_payload(event, first_payload)
-            if event and event.type in ("response.failed", "error"):
+            event_type = event_type_of(first_payload)
+            event = parse_event_payload(first_payload) if event_type in _TRACKED_EVENT_TYPES else None
+            if event and event.type in _FAILURE_EVENT_TYPES:
                 if event.type == "response.failed":
                     response = event.response
                     error = response.error if response else None
                 else:
                     error = event.error
-                code = _normalize_error_code(
-                    error.code if error else None,
-                    error.type if error else None,
-                )
+                code = _error_code_from_openai(error)
                 status = "error"
                 error_code = code
                 error_message = error.message if error else None
@@ -907,7 +805,7 @@ class ProxyService:
                     error_payload = _upstream_error_from_openai(error)
                     raise _RetryableStreamError(code, error_payload)
 
-            if event and event.type in ("response.completed", "response.incomplete"):
+            if event and event.type in _COMPLETION_EVENT_TYPES:
                 usage = event.response.usage if event.response else None
                 if event.type == "response.incomplete":
                     status = "error"
@@ -923,32 +821,38 @@ class ProxyService:
                 yield first
 
             async for line in iterator:
-                event_payload = parse_sse_data_json(line)
-                event = parse_sse_event(line)
-                event_type = _event_type_from_payload(event, event_payload)
-                if suppress_text_done_events and event_type in _TEXT_DELTA_EVENT_TYPES:
-                    saw_text_delta = True
-                if _should_suppress_text_done_event(
-                    event_type=event_type,
-                    payload=event_payload,
-                    suppress_text_done_events=suppress_text_done_events,
-                    saw_text_delta=saw_text_delta,
-                ):
+                if not suppress_text_done_events and not _may_carry_tracked_event(line):
+                    # Most lines are deltas that feed neither status/usage bookkeeping nor suppression, so
+                    # they are forwarded without decoding the JSON at all.
+                    yield line
                     continue
+                event_payload = parse_sse_data_json(line)
+                event_type = event_type_of(event_payload)
+                # Suppression is off for most routes, so the per-line check stays behind one bool test.
+                if suppress_text_done_events:
+                    if event_type in _TEXT_DELTA_EVENT_TYPES:
+                        saw_text_delta = True
+                    elif _should_suppress_text_done_event(
+                        event_type=event_type,
+                        payload=event_payload,
+                        suppress_text_done_events=True,
+                        saw_text_delta=saw_text_delta,
+                    ):
+                        continue
+                # Only the events below feed status/usage bookkeeping, so the typed model is built for
+                # them alone; every other line (deltas make up most of a stream) is just decoded once.
+                event = parse_event_payload(event_payload) if event_type in _TRACKED_EVENT_TYPES else None
                 if event:
-                    if event_type in ("response.failed", "error"):
+                    if event_type in _FAILURE_EVENT_TYPES:
                         status = "error"
                         if event_type == "response.failed":
                             response = event.response
                             error = response.error if response else None
                         else:
                             error = event.error
-                        error_code = _normalize_error_code(
-                            error.code if error else None,
-                            error.type if error else None,
-                        )
+                        error_code = _error_code_from_openai(error)
                         error_message = error.message if error else None
-                    if event_type in ("response.completed", "response.incomplete"):
+                    if event_type in _COMPLETION_EVENT_TYPES:
                         usage = event.response.usage if event.response else None
                         if event_type == "response.incomplete":
                             status = "error"
@@ -956,60 +860,51 @@ class ProxyService:
         except ProxyResponseError as exc:
             error = _parse_openai_error(exc.payload)
             status = "error"
-            error_code = _normalize_error_code(
-                error.code if error else None,
-                error.type if error else None,
-            )
+            error_code = _error_code_from_openai(error)
             error_message = error.message if error else None
             raise
         finally:
-            latency_ms = int((time.monotonic() - start) * 1000)
-            input_tokens = usage.input_tokens if usage else None
-            output_tokens = usage.output_tokens if usage else None
-            cached_input_tokens = (
-                usage.input_tokens_details.cached_tokens if usage and usage.input_tokens_details else None
-            )
-            reasoning_tokens = (
-                usage.output_tokens_details.reasoning_tokens if usage and usage.output_tokens_details else None
-            )
-            with anyio.CancelScope(shield=True):
-                try:
-                    get_metrics().observe_proxy_request(
-                        ProxyRequestObservation(
+            latency_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+            input_tokens, output_tokens, cached_input_tokens, reasoning_tokens = _usage_token_counts(usage)
+            try:
+                get_metrics().observe_proxy_request(
+                    ProxyRequestObservation(
+                        account_id=account_id_value,
+                        api=api,
+                        status=status,
+                        model=model or "unknown",
+                        latency_ms=latency_ms,
+                        input_tokens=input_tokens,
+                        output_tokens=output_tokens,
+                        cached_input_tokens=cached_input_tokens,
+                        reasoning_tokens=reasoning_tokens,
+                        error_code=error_code,
+                    )
+                )
+                if get_settings().request_logs_buffer_enabled:
+                    enqueue_request_log(
+                        RequestLogCreate(
                             account_id=account_id_value,
-                            api=api,
-                            status=status,
-                            model=model or "unknown",
-                            latency_ms=latency_ms,
+                            request_id=request_id,
+                            model=model,
                             input_tokens=input_tokens,
                             output_tokens=output_tokens,
                             cached_input_tokens=cached_input_tokens,
                             reasoning_tokens=reasoning_tokens,
+                            reasoning_effort=reasoning_effort,
+                            latency_ms=latency_ms,
+                            status=status,
                             error_code=error_code,
+                            error_message=error_message,
+                            prompt_cache_key_hash=prompt_cache_key_hash,
+                            codex_session_id=codex_session_id,
+                            codex_conversation_id=codex_conversation_id,
+                            requested_at=utcnow(),
                         )
                     )
-                    if get_settings().request_logs_buffer_enabled:
-                        enqueue_request_log(
-                            RequestLogCreate(
-                                account_id=account_id_value,
-                                request_id=request_id,
-                                model=model,
-                                input_tokens=input_tokens,
-                                output_tokens=output_tokens,
-                                cached_input_tokens=cached_input_tokens,
-                                reasoning_tokens=reasoning_tokens,
-                                reasoning_effort=reasoning_effort,
-                                latency_ms=latency_ms,
-                                status=status,
-                                error_code=error_code,
-                                error_message=error_message,
-                                prompt_cache_key_hash=prompt_cache_key_hash,
-                                codex_session_id=codex_session_id,
-                                codex_conversation_id=codex_conversation_id,
-                                requested_at=utcnow(),
-                            )
-                        )
-                    else:
+                else:
+                    # Only the direct write awaits, so only it needs shielding from the stream's cancellation.
+                    with anyio.CancelScope(shield=True):
                         async with self._repo_factory() as repos:
                             await repos.request_logs.add_log(
                                 account_id=account_id_value,
@@ -1028,13 +923,13 @@ class ProxyService:
                                 codex_session_id=codex_session_id,
                                 codex_conversation_id=codex_conversation_id,
                             )
-                except Exception:
-                    logger.warning(
-                        "Failed to persist request log account_id=%s request_id=%s",
-                        account_id_value,
-                        request_id,
-                        exc_info=True,
-                    )
+            except Exception:
+                logger.warning(
+                    "Failed to persist request log account_id=%s request_id=%s",
+                    account_id_value,
+                    request_id,
+                    exc_info=True,
+                )
 
     @staticmethod
     def _optional_header_value(headers: Mapping[str, str], name: str) -> str | None:
@@ -1049,54 +944,74 @@ class ProxyService:
                 return stripped or None
         return None
 
-    async def _latest_usage_rows(
-        self,
-        repos: ProxyRepositories,
-        account_map: dict[str, Account],
-        window: str,
-    ) -> list[UsageWindowRow]:
-        if not account_map:
-            return []
-        latest = await repos.usage.latest_by_account(window=window)
-        return [
-            UsageWindowRow(
-                account_id=entry.account_id,
-                used_percent=entry.used_percent,
-                reset_at=entry.reset_at,
-                window_minutes=entry.window_minutes,
-            )
-            for entry in latest.values()
-            if entry.account_id in account_map
-        ]
-
-    async def _latest_usage_entries(
-        self,
-        repos: ProxyRepositories,
-        account_map: dict[str, Account],
-    ) -> list[UsageHistory]:
-        if not account_map:
-            return []
-        latest = await repos.usage.latest_by_account()
-        return [entry for entry in latest.values() if entry.account_id in account_map]
+    @staticmethod
+    def _optional_header_values(headers: Mapping[str, str], *names: str) -> tuple[str | None, ...]:
+        # Same as `_optional_header_value()` for several names, in a single scan of the inbound mapping.
+        targets = {name.lower(): index for index, name in enumerate(names)}
+        values: list[str | None] = [None] * len(names)
+        for key, value in headers.items():
+            # Popping keeps the first match per name, like the single-name scan.
+            index = targets.pop(key.lower(), None)
+            if index is None:
+                continue
+            values[index] = value.strip() or None
+            if not targets:
+                break
+        return tuple(values)
+
+    def _access_token(self, account: Account) -> str:
+        encrypted = account.access_token_encrypted
+        now = time.monotonic()
+        cached = self._access_tokens.get(encrypted)
+        if cached is not None and cached.expires_at > now:
+            self._access_tokens.move_to_end(encrypted)
+            return cached.token
+        token = self._encryptor.decrypt(encrypted)
+        expires_at = now + _ACCESS_TOKEN_CACHE_TTL_SECONDS
+        self._access_tokens[encrypted] = _CachedAccessToken(token=token, expires_at=expires_at)
+        self._access_tokens.move_to_end(encrypted)
+        while len(self._access_tokens) > _ACCESS_TOKEN_CACHE_MAXSIZE:
+            self._access_tokens.popitem(last=False)
+        return token
 
     async def _ensure_fresh(self, account: Account, *, force: bool = False) -> Account:
+        # Concurrent requests on one account share a single refresh: refresh tokens rotate, so a
+        # second refresh with the same token would be rejected upstream. A forced caller (a 401) first
+        # waits for a non-forced refresh already in flight, and only forces another one if that refresh
+        # left the token that failed in place. The work runs in its own task so a cancelled caller
+        # cannot abort it between the upstream rotation and the DB write.
+        failed_token = account.access_token_encrypted
+        while True:
+            inflight = self._refresh_inflight.get(account.id)
+            if inflight is None or inflight.task.done():
+                task = asyncio.ensure_future(self._run_ensure_fresh(account, force=force))
+                inflight = _InflightRefresh(task=task, force=force)
+                self._refresh_inflight[account.id] = inflight
+                task.add_done_callback(partial(self._clear_inflight_refresh, account.id))
+                return await asyncio.shield(task)
+            refreshed = await asyncio.shield(inflight.task)
+            if not force or inflight.force or refreshed.access_token_encrypted != failed_token:
+                return refreshed
+            account = refreshed
+
+    async def _run_ensure_fresh(self, account: Account, *, force: bool) -> Account:
         async with self._repo_factory() as repos:
             auth_manager = AuthManager(repos.accounts)
             return await auth_manager.ensure_fresh(account, force=force)
 
+    def _clear_inflight_refresh(self, account_id: str, task: asyncio.Task[Account]) -> None:
+        inflight = self._refresh_inflight.get(account_id)
+        if inflight is not None and inflight.task is task:
+            del self._refresh_inflight[account_id]
+        if not task.cancelled():
+            # Mark the outcome as retrieved; callers that are still waiting re-raise it themselves.
+            task.exception()
+
     async def _ensure_fresh_if_needed(self, account: Account) -> Account:
         if account.chatgpt_account_id and not should_refresh(account.last_refresh):
             return account
         return await self._ensure_fresh(account)
 
-    async def _handle_proxy_error(self, account: Account, exc: ProxyResponseError) -> None:
-        error = _parse_openai_error(exc.payload)
-        code = _normalize_error_code(
-            error.code if error else None,
-            error.type if error else None,
-        )
-        await self._handle_stream_error(account, _upstream_error_from_openai(error), code)
-
     async def _handle_stream_error(self, account: Account, error: UpstreamError, code: str) -> None:
         # Upstream `usage_limit_reached` is treated as rate-limit-like (not quota-exceeded) for
         # account status. This keeps status semantics stable:
@@ -1129,15 +1044,42 @@ class _RetryableStreamError(Exception):
         self.error = error
 
 
-def _event_type_from_payload(event: OpenAIEvent | None, payload: dict[str, JsonValue] | None) -> str | None:
-    if event is not None:
-        return event.type
-    if payload is None:
-        return None
-    payload_type = payload.get("type")
-    if isinstance(payload_type, str):
-        return payload_type
-    return None
+def _usage_token_counts(
+    usage: ResponseUsage | None,
+) -> tuple[int | None, int | None, int | None, int | None]:
+    # (input, output, cached input, reasoning) token counts for metrics and request logs.
+    if usage is None:
+        return None, None, None, None
+    input_details = usage.input_tokens_details
+    output_details = usage.output_tokens_details
+    return (
+        usage.input_tokens,
+        usage.output_tokens,
+        input_details.cached_tokens if input_details else None,
+        output_details.reasoning_tokens if output_details else None,
+    )
+
+
+def _usage_window_rows(latest: Mapping[str, UsageHistory], account_map: dict[str, Account]) -> list[UsageWindowRow]:
+    return [
+        UsageWindowRow(
+            account_id=entry.account_id,
+            used_percent=entry.used_percent,
+            reset_at=entry.reset_at,
+            window_minutes=entry.window_minutes,
+        )
+        for entry in latest.values()
+        if entry.account_id in account_map
+    ]
+
+
+def _may_carry_tracked_event(line: str) -> bool:
+    # Substring pre-check: a line that never mentions a tracked type name cannot be one of those events. A
+    # false positive (e.g. "error" inside delta text) only means the line is decoded and checked properly.
+    for event_type in _TRACKED_EVENT_TYPES:
+        if event_type in line:
+            return True
+    return False
 
 
 def _should_suppress_text_done_event(
@@ -1226,9 +1168,10 @@ def _maybe_log_proxy_request_payload(
     payload_dict = payload.model_dump(mode="json", exclude_none=True)
     extra = payload.model_extra or {}
     if extra:
-        payload_dict = {**payload_dict, "_extra": extra}
+        # `model_dump` returns a fresh dict, so it can be extended in place.
+        payload_dict["_extra"] = extra
     header_keys = _interesting_header_keys(headers)
-    payload_json = json.dumps(payload_dict, ensure_ascii=True, separators=(",", ":"))
+    payload_json = _LOG_JSON_ENCODER.encode(payload_dict)
 
     logger.debug(
         "proxy_request_payload request_id=%s kind=%s payload=%s headers=%s",
@@ -1240,8 +1183,9 @@ def _maybe_log_proxy_request_payload(
 
 
 def _hash_identifier(value: str) -> str:
-    digest = sha256(value.encode("utf-8")).hexdigest()
-    return f"sha256:{digest[:12]}"
+    # Only de-identifies a value in debug logs, so a short BLAKE2b digest is enough (and cheaper than SHA-256).
+    digest = blake2b(value.encode("utf-8"), digest_size=6).hexdigest()
+    return f"blake2b:{digest}"
 
 
 def _summarize_input(items: JsonValue) -> str:
@@ -1252,10 +1196,7 @@ def _summarize_input(items: JsonValue) -> str:
     if isinstance(items, Sequence) and not isinstance(items, (str, bytes, bytearray)):
         if not items:
             return "0"
-        type_counts: dict[str, int] = {}
-        for item in items:
-            type_name = type(item).__name__
-            type_counts[type_name] = type_counts.get(type_name, 0) + 1
+        type_counts = Counter(type(item).__name__ for item in items)
         summary = ",".join(f"{key}={type_counts[key]}" for key in sorted(type_counts))
         return f"{len(items)}({summary})"
     return type(items).__name__
@@ -1268,19 +1209,7 @@ def _truncate_identifier(value: str, *, max_length: int = 96) -> str:
 
 
 def _interesting_header_keys(headers: Mapping[str, str]) -> list[str]:
-    allowlist = {
-        "user-agent",
-        "x-request-id",
-        "request-id",
-        "x-openai-client-id",
-        "x-openai-client-version",
-        "x-openai-client-arch",
-        "x-openai-client-os",
-        "x-openai-client-user-agent",
-        "x-codex-session-id",
-        "x-codex-conversation-id",
-    }
-    return sorted({key.lower() for key in headers.keys() if key.lower() in allowlist})
+    return sorted({lowered for lowered in map(str.lower, headers) if lowered in _INTERESTING_HEADER_KEYS})
 
 
 def _sticky_key_from_payload(payload: ResponsesRequest) -> str | None:
@@ -20,13 +20,14 @@ class StickySessionsRepository:
         return result.scalar_one_or_none()
 
     async def upsert(self, key: str, account_id: str) -> StickySession:
-        statement = self._build_upsert_statement(key, account_id)
-        await self._session.execute(statement)
-        await self._session.commit()
-        row = await self._session.get(StickySession, key)
+        # RETURNING hands back the stored row in the same round-trip; `populate_existing` overwrites any copy
+        # of it already in this session's identity map.
+        statement = self._build_upsert_statement(key, account_id).returning(StickySession)
+        result = await self._session.execute(statement, execution_options={"populate_existing": True})
+        row = result.scalar_one_or_none()
         if row is None:
             raise RuntimeError(f"StickySession upsert failed for key={key!r}")
-        await self._session.refresh(row)
+        await self._session.commit()
         return row
 
     async def delete(self, key: str) -> bool:
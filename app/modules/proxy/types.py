@@ -3,6 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 from app.core.types import JsonValue
+from app.core.usage.types import UsageWindowRow, UsageWindowSummary
 
 
 @dataclass(frozen=True)
@@ -35,3 +36,15 @@ class RateLimitStatusPayloadData:
     plan_type: str
     rate_limit: RateLimitStatusDetailsData | None = None
     credits: CreditStatusDetailsData | None = None
+
+
+@dataclass(frozen=True)
+class RateLimitUsageViewData:
+    # The DB-derived inputs of `RateLimitStatusPayloadData`. Window snapshots depend on the current time
+    # (`reset_after_seconds`), so they are rebuilt from this view on every request.
+    plan_type: str
+    primary_summary: UsageWindowSummary | None
+    primary_rows: list[UsageWindowRow]
+    secondary_summary: UsageWindowSummary | None
+    secondary_rows: list[UsageWindowRow]
+    credits: CreditStatusDetailsData | None
@@ -8,7 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.usage.types import UsageAggregateRow
 from app.core.utils.time import utcnow
 from app.db.models import UsageHistory
-from app.modules.proxy.rate_limit_cache import invalidate_rate_limit_headers_cache
+from app.modules.proxy.rate_limit_cache import invalidate_rate_limit_caches
 
 _SECONDARY_WINDOW_THRESHOLD_MINUTES = 24 * 60
 
@@ -33,7 +33,7 @@ class UsageRepository:
 
     async def commit(self) -> None:
         await self._session.commit()
-        invalidate_rate_limit_headers_cache()
+        invalidate_rate_limit_caches()
 
     async def rollback(self) -> None:
         await self._session.rollback()
@@ -71,7 +71,7 @@ class UsageRepository:
         if commit:
             await self._session.commit()
             await self._session.refresh(entry)
-            invalidate_rate_limit_headers_cache()
+            invalidate_rate_limit_caches()
         return entry
 
     async def aggregate_since(
@@ -189,3 +189,14 @@ class UsageRepository:
         result = await self._session.execute(select(func.max(UsageHistory.window_minutes)).where(conditions))
         value = result.scalar_one_or_none()
         return int(value) if value is not None else None
+
+    async def latest_primary_secondary_window_minutes(self) -> tuple[int | None, int | None]:
+        # Same result as `latest_window_minutes("primary")` and `("secondary")`, in one round-trip.
+        window_key = _effective_window_key_expr()
+        result = await self._session.execute(
+            select(window_key, func.max(UsageHistory.window_minutes))
+            .where(window_key.in_(("primary", "secondary")))
+            .group_by(window_key)
+        )
+        minutes = {window: int(value) for window, value in result.all() if value is not None}
+        return minutes.get("primary"), minutes.get("secondary")
@@ -40,7 +40,7 @@ class UsageRepositoryPort(Protocol):
         credits_balance: float | None = None,
         *,
         commit: bool = True,
-    ) -> UsageHistory | None: ...
+    ) -> UsageHistory: ...
 
     async def commit(self) -> None: ...
 
@@ -62,10 +62,12 @@ class UsageUpdater:
         self,
         accounts: list[Account],
         latest_usage: Mapping[str, UsageHistory],
-    ) -> None:
+    ) -> dict[str, UsageHistory]:
+        # Returns the secondary-window rows committed by this refresh, keyed by account id.
+        refreshed_secondary: dict[str, UsageHistory] = {}
         settings = get_settings()
         if not settings.usage_refresh_enabled:
-            return
+            return refreshed_secondary
 
         now = utcnow()
         interval = settings.usage_refresh_interval_seconds
@@ -81,7 +83,7 @@ class UsageUpdater:
             targets.append(_UsageRefreshTarget.from_account(account))
 
         if not targets:
-            return
+            return refreshed_secondary
 
         semaphore = asyncio.Semaphore(settings.usage_refresh_fetch_concurrency)
         fetch_results = await asyncio.gather(
@@ -102,13 +104,17 @@ class UsageUpdater:
             # sequentially within the request-scoped session.
             try:
                 if result.payload is not None:
-                    await self._persist_payload(account, result.payload)
+                    secondary_entry = await self._persist_payload(account, result.payload)
                     await self._usage_repo.commit()
+                    if secondary_entry is not None:
+                        refreshed_secondary[account.id] = secondary_entry
                     continue
 
                 if result.needs_auth_refresh:
-                    await self._refresh_account(account, usage_account_id=account.chatgpt_account_id)
+                    secondary_entry = await self._refresh_account(account, usage_account_id=account.chatgpt_account_id)
                     await self._usage_repo.commit()
+                    if secondary_entry is not None:
+                        refreshed_secondary[account.id] = secondary_entry
                     continue
             except Exception as exc:
                 await self._usage_repo.rollback()
@@ -120,8 +126,14 @@ class UsageUpdater:
                     exc_info=True,
                 )
                 continue
+        return refreshed_secondary
 
-    async def _refresh_account(self, account: Account, *, usage_account_id: str | None) -> None:
+    async def _refresh_account(
+        self,
+        account: Account,
+        *,
+        usage_account_id: str | None,
+    ) -> UsageHistory | None:
         access_token = self._encryptor.decrypt(account.access_token_encrypted)
         payload: UsagePayload | None = None
         try:
@@ -133,11 +145,11 @@ class UsageUpdater:
             # `initial_fetch` failures are already counted in `_fetch_usage_target` for this path.
             # Avoid double-counting when we enter the 401 refresh flow.
             if exc.status_code != 401 or not self._auth_manager:
-                return
+                return None
             try:
                 account = await self._auth_manager.ensure_fresh(account, force=True)
             except RefreshError:
-                return
+                return None
             access_token = self._encryptor.decrypt(account.access_token_encrypted)
             try:
                 payload = await fetch_usage(
@@ -158,13 +170,14 @@ class UsageUpdater:
                     retry_exc.message,
                     get_request_id(),
                 )
-                return
+                return None
 
         if payload is None:
-            return
-        await self._persist_payload(account, payload)
+            return None
+        return await self._persist_payload(account, payload)
 
-    async def _persist_payload(self, account: Account, payload: UsagePayload) -> None:
+    async def _persist_payload(self, account: Account, payload: UsagePayload) -> UsageHistory | None:
+        # Returns the secondary-window row written, if any.
         if self._accounts_repo is not None and payload.plan_type is not None:
             updated_plan_type = coerce_account_plan_type(payload.plan_type, account.plan_type or DEFAULT_PLAN)
             if updated_plan_type != account.plan_type:
@@ -192,7 +205,7 @@ class UsageUpdater:
 
         rate_limit = payload.rate_limit
         if rate_limit is None:
-            return
+            return None
 
         primary = rate_limit.primary_window
         secondary = rate_limit.secondary_window
@@ -200,6 +213,7 @@ class UsageUpdater:
         now_epoch = _now_epoch()
 
         recorded: set[str] = set()
+        secondary_entry: UsageHistory | None = None
         candidates = (("primary", primary), ("secondary", secondary))
         for default_window, window_payload in candidates:
             if window_payload is None or window_payload.used_percent is None:
@@ -211,7 +225,7 @@ class UsageUpdater:
             if effective_window in recorded:
                 continue
             recorded.add(effective_window)
-            await self._usage_repo.add_entry(
+            entry = await self._usage_repo.add_entry(
                 account_id=account.id,
                 used_percent=float(window_payload.used_percent),
                 input_tokens=None,
@@ -228,6 +242,9 @@ class UsageUpdater:
                 credits_balance=credits_balance if default_window == "primary" else None,
                 commit=False,
             )
+            if effective_window == "secondary":
+                secondary_entry = entry
+        return secondary_entry
 
     async def _fetch_usage_target(
         self,
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 import tempfile
+from collections.abc import Iterator
 from pathlib import Path
 from uuid import uuid4
 
@@ -21,6 +22,8 @@ os.environ["CODEX_LB_USAGE_REFRESH_ENABLED"] = "false"
 os.environ["CODEX_LB_PROXY_SNAPSHOT_TTL_SECONDS"] = "0.0001"
 os.environ["CODEX_LB_REQUEST_LOGS_BUFFER_ENABLED"] = "false"
 
+from app.core.config.settings import get_settings  # noqa: E402
+from app.core.request_logs.buffer import RequestLogBuffer, get_request_log_buffer  # noqa: E402
 from app.db.models import Account, Base  # noqa: E402
 from app.db.session import accounts_engine, engine  # noqa: E402
 from app.main import create_app  # noqa: E402
@@ -83,3 +86,15 @@ def temp_key_file(monkeypatch):
 
     get_settings.cache_clear()
     return key_path
+
+
+@pytest.fixture
+def request_log_buffer(monkeypatch) -> Iterator[RequestLogBuffer]:
+    monkeypatch.setenv("CODEX_LB_REQUEST_LOGS_BUFFER_ENABLED", "true")
+    get_settings.cache_clear()
+    get_request_log_buffer.cache_clear()
+    buffer = get_request_log_buffer()
+    yield buffer
+    buffer.drain(10_000)
+    get_settings.cache_clear()
+    get_request_log_buffer.cache_clear()
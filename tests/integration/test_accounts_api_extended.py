@@ -269,6 +269,58 @@ async def test_accounts_repository_bulk_update_clears_reset_at_when_not_blocked(
         assert account.reset_at is None
 
 
+@pytest.mark.asyncio
+async def test_accounts_repository_bulk_update_applies_per_account_fields(db_setup):
+    blocked_until = 1736294400
+
+    async with AccountsSessionLocal() as accounts_session:
+        accounts_repo = AccountsRepository(accounts_session)
+        await accounts_repo.upsert(_make_account("acc_bulk_limited", "bulk_limited@example.com"))
+        await accounts_repo.upsert(_make_account("acc_bulk_deactivated", "bulk_deactivated@example.com"))
+        await accounts_repo.upsert(_make_account("acc_bulk_untouched", "bulk_untouched@example.com"))
+
+    async with AccountsSessionLocal() as accounts_session:
+        accounts_repo = AccountsRepository(accounts_session)
+        updated = await accounts_repo.bulk_update_status_fields(
+            [
+                AccountStatusUpdate(
+                    account_id="acc_bulk_limited",
+                    status=AccountStatus.RATE_LIMITED,
+                    deactivation_reason=None,
+                    reset_at=blocked_until,
+                ),
+                AccountStatusUpdate(
+                    account_id="acc_bulk_deactivated",
+                    status=AccountStatus.DEACTIVATED,
+                    deactivation_reason="account_suspended",
+                    reset_at=blocked_until,
+                ),
+                AccountStatusUpdate(
+                    account_id="acc_bulk_missing",
+                    status=AccountStatus.PAUSED,
+                    deactivation_reason=None,
+                    reset_at=None,
+                ),
+            ]
+        )
+        assert updated == 2
+
+    async with AccountsSessionLocal() as accounts_session:
+        accounts_repo = AccountsRepository(accounts_session)
+        limited = await accounts_repo.get_account("acc_bulk_limited")
+        deactivated = await accounts_repo.get_account("acc_bulk_deactivated")
+        untouched = await accounts_repo.get_account("acc_bulk_untouched")
+        assert limited is not None
+        assert limited.status == AccountStatus.RATE_LIMITED
+        assert limited.reset_at == blocked_until
+        assert deactivated is not None
+        assert deactivated.status == AccountStatus.DEACTIVATED
+        assert deactivated.deactivation_reason == "account_suspended"
+        assert deactivated.reset_at is None
+        assert untouched is not None
+        assert untouched.status == AccountStatus.ACTIVE
+
+
 @pytest.mark.asyncio
 async def test_accounts_list_clears_stale_blocked_status(async_client, db_setup):
     async with AccountsSessionLocal() as accounts_session:
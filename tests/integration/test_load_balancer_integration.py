@@ -343,3 +343,98 @@ async def test_load_balancer_unpins_quota_exceeded_accounts(db_setup):
     async with SessionLocal() as session:
         settings_repo = SettingsRepository(session)
         assert await settings_repo.pinned_account_ids() == []
+
+
+@pytest.mark.asyncio
+async def test_load_balancer_snapshot_refresh_picks_up_account_changes(db_setup):
+    encryptor = TokenEncryptor()
+    now = utcnow()
+
+    acc_paused_later = Account(
+        id="acc_refresh_a",
+        email="refresh_a@example.com",
+        plan_type="plus",
+        access_token_encrypted=encryptor.encrypt("access-a"),
+        refresh_token_encrypted=encryptor.encrypt("refresh-a"),
+        id_token_encrypted=encryptor.encrypt("id-a"),
+        last_refresh=now,
+        status=AccountStatus.ACTIVE,
+        deactivation_reason=None,
+    )
+    acc_other = Account(
+        id="acc_refresh_b",
+        email="refresh_b@example.com",
+        plan_type="plus",
+        access_token_encrypted=encryptor.encrypt("access-b"),
+        refresh_token_encrypted=encryptor.encrypt("refresh-b"),
+        id_token_encrypted=encryptor.encrypt("id-b"),
+        last_refresh=now,
+        status=AccountStatus.ACTIVE,
+        deactivation_reason=None,
+    )
+
+    async with AccountsSessionLocal() as accounts_session:
+        accounts_repo = AccountsRepository(accounts_session)
+        await accounts_repo.upsert(acc_paused_later)
+        await accounts_repo.upsert(acc_other)
+
+    balancer = LoadBalancer(_repo_factory)
+    first = await balancer.select_account()
+    assert first.account is not None
+
+    balancer.invalidate_snapshot()
+    unchanged = await balancer.select_account()
+    assert unchanged.account is not None
+
+    async with AccountsSessionLocal() as accounts_session:
+        accounts_repo = AccountsRepository(accounts_session)
+        await accounts_repo.update_status(acc_paused_later.id, AccountStatus.PAUSED)
+
+    balancer.invalidate_snapshot()
+    for _ in range(3):
+        selection = await balancer.select_account()
+        assert selection.account is not None
+        assert selection.account.id == acc_other.id
+
+
+@pytest.mark.asyncio
+async def test_load_balancer_snapshot_refresh_picks_up_reimported_tokens(db_setup):
+    encryptor = TokenEncryptor()
+    now = utcnow()
+
+    account = Account(
+        id="acc_reimport",
+        chatgpt_account_id="chatgpt-old",
+        email="reimport@example.com",
+        plan_type="plus",
+        access_token_encrypted=encryptor.encrypt("access-old"),
+        refresh_token_encrypted=encryptor.encrypt("refresh-old"),
+        id_token_encrypted=encryptor.encrypt("id-old"),
+        last_refresh=now,
+        status=AccountStatus.ACTIVE,
+        deactivation_reason=None,
+    )
+    async with AccountsSessionLocal() as accounts_session:
+        await AccountsRepository(accounts_session).upsert(account)
+
+    balancer = LoadBalancer(_repo_factory)
+    first = await balancer.select_account()
+    assert first.account is not None
+    assert first.account.chatgpt_account_id == "chatgpt-old"
+
+    # A re-import keeps the source file's `last_refresh` while replacing the tokens.
+    async with AccountsSessionLocal() as accounts_session:
+        await AccountsRepository(accounts_session).update_tokens(
+            account.id,
+            access_token_encrypted=encryptor.encrypt("access-new"),
+            refresh_token_encrypted=encryptor.encrypt("refresh-new"),
+            id_token_encrypted=encryptor.encrypt("id-new"),
+            last_refresh=now,
+            chatgpt_account_id="chatgpt-new",
+        )
+
+    balancer.invalidate_snapshot()
+    selection = await balancer.select_account()
+    assert selection.account is not None
+    assert selection.account.chatgpt_account_id == "chatgpt-new"
+    assert encryptor.decrypt(selection.account.access_token_encrypted) == "access-new"
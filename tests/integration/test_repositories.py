@@ -10,6 +10,10 @@ from app.core.utils.time import utcnow
 from app.db.models import Account, AccountStatus
 from app.db.session import AccountsSessionLocal, SessionLocal
 from app.modules.accounts.repository import AccountsRepository
+from app.modules.accounts.service import AccountsService
+from app.modules.proxy import rate_limit_cache
+from app.modules.proxy.rate_limit_cache import RateLimitHeaderCache, get_or_build_rate_limit_headers
+from app.modules.proxy.sticky_repository import StickySessionsRepository
 from app.modules.request_logs.repository import RequestLogsRepository
 from app.modules.usage.repository import UsageRepository
 
@@ -54,6 +58,50 @@ async def test_accounts_upsert_updates_existing_by_email(db_setup):
         assert len(list(all_accounts.scalars().all())) == 1
 
 
+@pytest.mark.asyncio
+async def test_account_status_changes_invalidate_rate_limit_caches(db_setup, monkeypatch):
+    monkeypatch.setattr(rate_limit_cache, "_DEFAULT", RateLimitHeaderCache())
+    builds = 0
+
+    async def build() -> dict[str, str]:
+        nonlocal builds
+        builds += 1
+        return {"x-codex-primary-used-percent": f"{builds}.0"}
+
+    async with AccountsSessionLocal() as session:
+        repo = AccountsRepository(session)
+        await repo.upsert(_make_account("acc1", "a@example.com"))
+        first = await get_or_build_rate_limit_headers(build)
+
+        # Token rotation does not change anything the rate limit views read.
+        encryptor = TokenEncryptor()
+        await repo.update_tokens(
+            "acc1",
+            access_token_encrypted=encryptor.encrypt("access-2"),
+            refresh_token_encrypted=encryptor.encrypt("refresh-2"),
+            id_token_encrypted=encryptor.encrypt("id-2"),
+            last_refresh=utcnow(),
+        )
+        assert await get_or_build_rate_limit_headers(build) == first
+
+        assert await AccountsService(repo).pause_account("acc1")
+        assert await get_or_build_rate_limit_headers(build) != first
+
+
+@pytest.mark.asyncio
+async def test_sticky_sessions_upsert_returns_stored_row(db_setup):
+    async with SessionLocal() as session:
+        repo = StickySessionsRepository(session)
+        created = await repo.upsert("sticky-key", "acc1")
+        assert created.account_id == "acc1"
+        assert created.created_at is not None
+
+        updated = await repo.upsert("sticky-key", "acc2")
+        assert updated is created
+        assert updated.account_id == "acc2"
+        assert await repo.get_account_id("sticky-key") == "acc2"
+
+
 @pytest.mark.asyncio
 async def test_usage_repository_aggregate(db_setup):
     async with AccountsSessionLocal() as accounts_session:
@@ -128,6 +176,22 @@ async def test_usage_repository_effective_window_reclassifies_primary_day_window
         assert latest_secondary["acc1"].window_minutes == 10080
 
 
+@pytest.mark.asyncio
+async def test_usage_repository_latest_primary_secondary_window_minutes(db_setup):
+    async with SessionLocal() as session:
+        repo = UsageRepository(session)
+        assert await repo.latest_primary_secondary_window_minutes() == (None, None)
+
+        now = utcnow()
+        await repo.add_entry("acc1", 10.0, recorded_at=now, window="primary", window_minutes=300)
+        await repo.add_entry("acc1", 10.0, recorded_at=now, window=None, window_minutes=240)
+        await repo.add_entry("acc1", 10.0, recorded_at=now, window="primary", window_minutes=10080)
+
+        assert await repo.latest_primary_secondary_window_minutes() == (300, 10080)
+        assert await repo.latest_window_minutes("primary") == 300
+        assert await repo.latest_window_minutes("secondary") == 10080
+
+
 @pytest.mark.asyncio
 async def test_usage_repository_latest_primary_secondary_by_account(db_setup):
     async with AccountsSessionLocal() as accounts_session:
@@ -3,6 +3,7 @@ from __future__ import annotations
 import pytest
 
 from app.core.clients.proxy import _error_event_from_response, _error_payload_from_response
+from app.modules.proxy.helpers import _error_code_from_openai, _parse_openai_error, _upstream_error_from_openai
 
 pytestmark = pytest.mark.unit
 
@@ -94,3 +95,14 @@ async def test_error_event_fallback_no_reason():
     event = await _error_event_from_response(resp)
 
     assert event["response"]["error"].get("message") == "Upstream error: HTTP 500"
+
+
+def test_openai_error_classification_reads_code_and_retry_hints():
+    error = _parse_openai_error(
+        {"error": {"message": "slow down", "type": "Rate_Limit_Exceeded", "resets_in_seconds": 12, "extra": 1}}
+    )
+
+    assert _error_code_from_openai(error) == "rate_limit_exceeded"
+    assert _upstream_error_from_openai(error) == {"message": "slow down", "resets_in_seconds": 12}
+    assert _error_code_from_openai(None) == "upstream_error"
+    assert _upstream_error_from_openai(None) == {}
@@ -1,8 +1,20 @@
 from __future__ import annotations
 
+import asyncio
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from typing import Mapping
 
+import pytest
+
+from app.core.clients.proxy import ProxyResponseError
+from app.core.crypto import TokenEncryptor
+from app.core.errors import openai_error
+from app.core.openai.models import OpenAIResponsePayload
+from app.core.openai.requests import ResponsesCompactRequest
 from app.db.models import Account, AccountStatus
+from app.modules.proxy import service as proxy_service_mod
+from app.modules.proxy.load_balancer import AccountSelection
 from app.modules.proxy.service import ProxyService
 
 
@@ -64,3 +76,236 @@ async def test_proxy_service_ensures_freshness_when_missing_account_id() -> None
     out = await service._ensure_fresh_if_needed(account)
     assert out is account
     assert ensure_calls == 1
+
+
+def test_proxy_service_reuses_decrypted_access_token_until_ciphertext_changes() -> None:
+    service = ProxyService(repo_factory=lambda: (_ for _ in ()).throw(RuntimeError("repo_factory should not run")))
+    encryptor = service._encryptor
+
+    account = Account(
+        id="acc",
+        chatgpt_account_id="chatgpt",
+        email="a@example.com",
+        plan_type="plus",
+        access_token_encrypted=encryptor.encrypt("access-1"),
+        refresh_token_encrypted=b"b",
+        id_token_encrypted=b"c",
+        last_refresh=datetime.now(timezone.utc),
+        status=AccountStatus.ACTIVE,
+        deactivation_reason=None,
+    )
+
+    decrypt_calls = 0
+    original_decrypt = encryptor.decrypt
+
+    def counting_decrypt(encrypted: bytes) -> str:
+        nonlocal decrypt_calls
+        decrypt_calls += 1
+        return original_decrypt(encrypted)
+
+    encryptor.decrypt = counting_decrypt  # type: ignore[method-assign]
+
+    assert service._access_token(account) == "access-1"
+    assert service._access_token(account) == "access-1"
+    assert decrypt_calls == 1
+
+    account.access_token_encrypted = encryptor.encrypt("access-2")
+    assert service._access_token(account) == "access-2"
+    assert decrypt_calls == 2
+
+
+async def test_proxy_service_concurrent_refreshes_share_one_call() -> None:
+    service = ProxyService(repo_factory=lambda: (_ for _ in ()).throw(RuntimeError("repo_factory should not run")))
+
+    release = asyncio.Event()
+    refresh_calls: list[bool] = []
+
+    async def fake_run_ensure_fresh(account: Account, *, force: bool) -> Account:
+        refresh_calls.append(force)
+        await release.wait()
+        return account
+
+    service._run_ensure_fresh = fake_run_ensure_fresh  # type: ignore[method-assign]
+
+    account = Account(
+        id="acc",
+        chatgpt_account_id=None,
+        email="a@example.com",
+        plan_type="plus",
+        access_token_encrypted=b"a",
+        refresh_token_encrypted=b"b",
+        id_token_encrypted=b"c",
+        last_refresh=datetime.now(timezone.utc),
+        status=AccountStatus.ACTIVE,
+        deactivation_reason=None,
+    )
+
+    waiters = [asyncio.create_task(service._ensure_fresh(account, force=True)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+
+    assert refresh_calls == [True]
+    assert all(result is account for result in results)
+
+    await service._ensure_fresh(account, force=True)
+    assert refresh_calls == [True, True]
+
+
+async def test_proxy_service_forced_refresh_waits_for_inflight_refresh() -> None:
+    service = ProxyService(repo_factory=lambda: (_ for _ in ()).throw(RuntimeError("repo_factory should not run")))
+
+    release = asyncio.Event()
+    refresh_calls: list[bool] = []
+    running = 0
+    plain_refresh_rotates = False
+
+    async def fake_run_ensure_fresh(account: Account, *, force: bool) -> Account:
+        nonlocal running
+        running += 1
+        assert running == 1
+        refresh_calls.append(force)
+        await release.wait()
+        if force or plain_refresh_rotates:
+            account.access_token_encrypted = b"rotated"
+        running -= 1
+        return account
+
+    service._run_ensure_fresh = fake_run_ensure_fresh  # type: ignore[method-assign]
+
+    account = Account(
+        id="acc",
+        chatgpt_account_id=None,
+        email="a@example.com",
+        plan_type="plus",
+        access_token_encrypted=b"a",
+        refresh_token_encrypted=b"b",
+        id_token_encrypted=b"c",
+        last_refresh=datetime.now(timezone.utc),
+        status=AccountStatus.ACTIVE,
+        deactivation_reason=None,
+    )
+
+    # The in-flight non-forced refresh keeps the failing token, so the forced caller refreshes after it.
+    background = asyncio.create_task(service._ensure_fresh(account))
+    await asyncio.sleep(0)
+    forced = asyncio.create_task(service._ensure_fresh(account, force=True))
+    await asyncio.sleep(0)
+    release.set()
+    await background
+    assert (await forced).access_token_encrypted == b"rotated"
+    assert refresh_calls == [False, True]
+
+    # A non-forced refresh that already replaced the failing token satisfies the forced caller.
+    release.clear()
+    refresh_calls.clear()
+    plain_refresh_rotates = True
+    account.access_token_encrypted = b"a"
+    background = asyncio.create_task(service._ensure_fresh(account))
+    await asyncio.sleep(0)
+    forced = asyncio.create_task(service._ensure_fresh(account, force=True))
+    await asyncio.sleep(0)
+    release.set()
+    await background
+    assert (await forced).access_token_encrypted == b"rotated"
+    assert refresh_calls == [False]
+
+
+@dataclass(slots=True)
+class _CompactHarness:
+    service: ProxyService
+    seen_tokens: list[str] = field(default_factory=list)
+    selections: int = 0
+    handled_codes: list[str] = field(default_factory=list)
+
+
+def _compact_harness_with_stale_token(monkeypatch, post_refresh_error: ProxyResponseError | None) -> _CompactHarness:
+    # One account whose first compact call gets a 401; the forced refresh swaps in a "fresh" token, and the
+    # retried call either succeeds or raises `post_refresh_error`.
+    encryptor = TokenEncryptor()
+    account = Account(
+        id="acc",
+        chatgpt_account_id="chatgpt",
+        email="a@example.com",
+        plan_type="plus",
+        access_token_encrypted=encryptor.encrypt("stale"),
+        refresh_token_encrypted=encryptor.encrypt("refresh"),
+        id_token_encrypted=encryptor.encrypt("id"),
+        last_refresh=datetime.now(timezone.utc),
+        status=AccountStatus.ACTIVE,
+        deactivation_reason=None,
+    )
+    harness = _CompactHarness(
+        service=ProxyService(repo_factory=lambda: (_ for _ in ()).throw(RuntimeError("repo_factory should not run")))
+    )
+
+    async def fake_compact_responses(
+        payload: ResponsesCompactRequest,
+        headers: Mapping[str, str],
+        access_token: str,
+        account_id: str | None,
+    ) -> OpenAIResponsePayload:
+        harness.seen_tokens.append(access_token)
+        if access_token == "stale":
+            raise ProxyResponseError(401, openai_error("invalid_api_key", "token expired"))
+        if post_refresh_error is not None:
+            raise post_refresh_error
+        return OpenAIResponsePayload(id="resp_compact", status="completed")
+
+    async def fake_select_account(
+        sticky_key: str | None = None,
+        *,
+        reallocate_sticky: bool = False,
+    ) -> AccountSelection:
+        harness.selections += 1
+        return AccountSelection(account=account, error_message=None)
+
+    async def fake_ensure_fresh(target: Account, *, force: bool = False) -> Account:
+        assert force
+        target.access_token_encrypted = encryptor.encrypt("fresh")
+        return target
+
+    async def fake_ensure_fresh_if_needed(target: Account) -> Account:
+        return target
+
+    async def fake_handle_stream_error(target: Account, error: object, code: str) -> None:
+        harness.handled_codes.append(code)
+
+    service = harness.service
+    monkeypatch.setattr(proxy_service_mod, "core_compact_responses", fake_compact_responses)
+    monkeypatch.setattr(service._load_balancer, "select_account", fake_select_account)
+    service._ensure_fresh = fake_ensure_fresh  # type: ignore[method-assign]
+    service._ensure_fresh_if_needed = fake_ensure_fresh_if_needed  # type: ignore[method-assign]
+    service._handle_stream_error = fake_handle_stream_error  # type: ignore[method-assign]
+    return harness
+
+
+async def test_compact_retries_unauthorized_once_with_refreshed_token(monkeypatch, request_log_buffer) -> None:
+    harness = _compact_harness_with_stale_token(monkeypatch, post_refresh_error=None)
+
+    payload = ResponsesCompactRequest.model_validate({"model": "gpt-5.1", "instructions": "hi", "input": "hello"})
+    result = await harness.service.compact_responses(payload, {})
+
+    assert result.status == "completed"
+    assert harness.seen_tokens == ["stale", "fresh"]
+    assert harness.selections == 1
+    entries = request_log_buffer.drain(10_000)
+    assert [entry.status for entry in entries] == ["success"]
+
+
+async def test_compact_raises_post_refresh_error_without_failover(monkeypatch, request_log_buffer) -> None:
+    harness = _compact_harness_with_stale_token(
+        monkeypatch,
+        post_refresh_error=ProxyResponseError(429, openai_error("rate_limit_exceeded", "slow down")),
+    )
+
+    payload = ResponsesCompactRequest.model_validate({"model": "gpt-5.1", "instructions": "hi", "input": "hello"})
+    with pytest.raises(ProxyResponseError) as exc_info:
+        await harness.service.compact_responses(payload, {})
+
+    assert exc_info.value.status_code == 429
+    assert harness.seen_tokens == ["stale", "fresh"]
+    assert harness.selections == 1
+    assert harness.handled_codes == ["rate_limit_exceeded"]
+    entries = request_log_buffer.drain(10_000)
+    assert [(entry.status, entry.error_code) for entry in entries] == [("error", "rate_limit_exceeded")]
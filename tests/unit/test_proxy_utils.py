@@ -8,7 +8,7 @@ import pytest
 
 import app.core.clients.proxy as proxy_module
 from app.core.clients.proxy import _build_upstream_headers, filter_inbound_headers
-from app.core.openai.parsing import parse_sse_event
+from app.core.openai.parsing import event_type_of, parse_event_payload, parse_sse_event
 from app.core.openai.requests import ResponsesRequest
 from app.core.utils.request_id import reset_request_id, set_request_id
 from app.modules.proxy import service as proxy_service
@@ -112,6 +112,40 @@ def test_parse_sse_event_concats_multiple_data_lines():
     assert event.type == "response.completed"
 
 
+def test_event_type_of_matches_parsed_event_type():
+    payload = {"type": "response.failed", "response": {"id": "resp_1", "status": "failed"}}
+    event = parse_event_payload(payload)
+
+    assert event is not None
+    assert event_type_of(payload) == event.type
+    assert event_type_of({"type": 1}) is None
+    assert event_type_of(None) is None
+    assert parse_event_payload(None) is None
+
+
+def test_optional_header_values_match_single_name_lookups():
+    headers = {
+        "X-Codex-Session-Id": " sess ",
+        "x-codex-session-id": "later",
+        "X-Codex-Conversation-Id": "   ",
+        "User-Agent": "codex",
+    }
+    names = ("x-codex-session-id", "x-codex-conversation-id", "x-request-id")
+
+    values = proxy_service.ProxyService._optional_header_values(headers, *names)
+
+    assert values == ("sess", None, None)
+    assert values == tuple(proxy_service.ProxyService._optional_header_value(headers, name) for name in names)
+
+
+def test_may_carry_tracked_event_prescan():
+    delta = 'data: {"type":"response.output_text.delta","delta":"hello"}\n\n'
+    assert not proxy_service._may_carry_tracked_event(delta)
+    for event_type in proxy_service._TRACKED_EVENT_TYPES:
+        line = f"data: {json.dumps({'type': event_type})}\n\n"
+        assert proxy_service._may_carry_tracked_event(line)
+
+
 def test_normalize_sse_event_block_rewrites_response_text_alias():
     block = 'data: {"type":"response.text.delta","delta":"hi"}\n\n'
 
@@ -203,6 +237,32 @@ def test_log_proxy_request_payload(monkeypatch, caplog):
     assert '"model":"gpt-5.1"' in caplog.text
 
 
+def test_log_proxy_request_shape(monkeypatch, caplog):
+    payload = ResponsesRequest.model_validate(
+        {
+            "model": "gpt-5.1",
+            "instructions": "hi",
+            "input": [{"role": "user", "content": "hi"}],
+            "prompt_cache_key": "thread_123",
+        }
+    )
+
+    class Settings:
+        log_proxy_request_payload = False
+        log_proxy_request_shape = True
+        log_proxy_request_shape_raw_cache_key = False
+
+    monkeypatch.setattr(proxy_service, "get_settings", lambda: Settings())
+
+    caplog.set_level(logging.DEBUG)
+    proxy_service._maybe_log_proxy_request_shape("stream", payload, {"X-Request-Id": "req_shape_1"})
+
+    assert "proxy_request_shape" in caplog.text
+    assert "prompt_cache_key=blake2b:" in caplog.text
+    assert "thread_123" not in caplog.text
+    assert "headers=['x-request-id']" in caplog.text
+
+
 def test_settings_parses_image_inline_allowlist_from_csv(monkeypatch):
     monkeypatch.setenv("CODEX_LB_IMAGE_INLINE_ALLOWED_HOSTS", "a.example, b.example ,,C.Example")
     from app.core.config.settings import Settings
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.modules.proxy import rate_limit_cache
+from app.modules.proxy.rate_limit_cache import (
+    RateLimitHeaderCache,
+    RateLimitPayloadCache,
+    get_or_build_rate_limit_headers,
+    get_or_build_rate_limit_usage_view,
+    invalidate_rate_limit_caches,
+)
+from app.modules.proxy.types import RateLimitUsageViewData
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture(autouse=True)
+def _reset_cache(monkeypatch):
+    monkeypatch.setattr(rate_limit_cache, "_DEFAULT", RateLimitHeaderCache())
+    monkeypatch.setattr(rate_limit_cache, "_PAYLOAD", RateLimitPayloadCache())
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_build():
+    calls = 0
+    release = asyncio.Event()
+
+    async def build() -> dict[str, str]:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"x-codex-primary-used-percent": "12.0"}
+
+    waiters = [asyncio.create_task(get_or_build_rate_limit_headers(build)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+
+    assert calls == 1
+    assert all(result == {"x-codex-primary-used-percent": "12.0"} for result in results)
+    assert await get_or_build_rate_limit_headers(build) == results[0]
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_build_is_not_cached():
+    calls = 0
+
+    async def build() -> dict[str, str]:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("db down")
+        return {"x-codex-primary-used-percent": "1.0"}
+
+    with pytest.raises(RuntimeError):
+        await get_or_build_rate_limit_headers(build)
+    assert await get_or_build_rate_limit_headers(build) == {"x-codex-primary-used-percent": "1.0"}
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_serves_recent_value():
+    # A zero TTL makes the next read a plain expiry refresh, still within the stale grace window.
+    cache = RateLimitHeaderCache(ttl_seconds=0)
+    calls = 0
+
+    async def build() -> dict[str, str]:
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise RuntimeError("db down")
+        return {"x-codex-primary-used-percent": f"{calls}.0"}
+
+    assert await cache.get_or_build(build) == {"x-codex-primary-used-percent": "1.0"}
+    assert await cache.get_or_build(build) == {"x-codex-primary-used-percent": "1.0"}
+    # The failure is not cached, so the next read rebuilds.
+    assert await cache.get_or_build(build) == {"x-codex-primary-used-percent": "3.0"}
+
+
+@pytest.mark.asyncio
+async def test_failed_rebuild_after_invalidation_raises():
+    calls = 0
+
+    async def build() -> dict[str, str]:
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise RuntimeError("db down")
+        return {"x-codex-primary-used-percent": f"{calls}.0"}
+
+    assert await get_or_build_rate_limit_headers(build) == {"x-codex-primary-used-percent": "1.0"}
+    invalidate_rate_limit_caches()
+    with pytest.raises(RuntimeError):
+        await get_or_build_rate_limit_headers(build)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_abort_shared_build():
+    release = asyncio.Event()
+
+    async def build() -> dict[str, str]:
+        await release.wait()
+        return {"x-codex-primary-used-percent": "5.0"}
+
+    first = asyncio.create_task(get_or_build_rate_limit_headers(build))
+    second = asyncio.create_task(get_or_build_rate_limit_headers(build))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == {"x-codex-primary-used-percent": "5.0"}
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+@pytest.mark.asyncio
+async def test_invalidation_during_build_forces_rebuild():
+    release = asyncio.Event()
+    calls = 0
+
+    async def build() -> dict[str, str]:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await release.wait()
+        return {"x-codex-primary-used-percent": str(float(calls))}
+
+    first = asyncio.create_task(get_or_build_rate_limit_headers(build))
+    await asyncio.sleep(0)
+    invalidate_rate_limit_caches()
+    release.set()
+
+    assert await first == {"x-codex-primary-used-percent": "1.0"}
+    assert await get_or_build_rate_limit_headers(build) == {"x-codex-primary-used-percent": "2.0"}
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_value_is_served_while_refresh_runs():
+    release = asyncio.Event()
+    calls = 0
+
+    async def build() -> dict[str, str]:
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            await release.wait()
+        return {"x-codex-primary-used-percent": str(float(calls))}
+
+    assert await get_or_build_rate_limit_headers(build) == {"x-codex-primary-used-percent": "1.0"}
+    invalidate_rate_limit_caches()
+
+    refresher = asyncio.create_task(get_or_build_rate_limit_headers(build))
+    await asyncio.sleep(0)
+    assert await get_or_build_rate_limit_headers(build) == {"x-codex-primary-used-percent": "1.0"}
+
+    release.set()
+    assert await refresher == {"x-codex-primary-used-percent": "2.0"}
+    assert await get_or_build_rate_limit_headers(build) == {"x-codex-primary-used-percent": "2.0"}
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_partial_refresh_carries_missing_groups_for_one_ttl():
+    # A zero TTL makes every read a plain expiry refresh, with no invalidation in between.
+    cache = RateLimitHeaderCache(ttl_seconds=0)
+    results = [
+        {"x-codex-primary-used-percent": "10.0", "x-codex-secondary-used-percent": "20.0"},
+        {"x-codex-primary-used-percent": "11.0"},
+        {"x-codex-primary-used-percent": "12.0"},
+    ]
+
+    async def build() -> dict[str, str]:
+        return results.pop(0)
+
+    assert await cache.get_or_build(build) == {
+        "x-codex-primary-used-percent": "10.0",
+        "x-codex-secondary-used-percent": "20.0",
+    }
+    assert await cache.get_or_build(build) == {
+        "x-codex-primary-used-percent": "11.0",
+        "x-codex-secondary-used-percent": "20.0",
+    }
+    assert await cache.get_or_build(build) == {"x-codex-primary-used-percent": "12.0"}
+
+
+@pytest.mark.asyncio
+async def test_partial_rebuild_after_invalidation_is_authoritative():
+    results = [
+        {"x-codex-primary-used-percent": "10.0", "x-codex-secondary-used-percent": "20.0"},
+        {"x-codex-primary-used-percent": "11.0"},
+    ]
+
+    async def build() -> dict[str, str]:
+        return results.pop(0)
+
+    await get_or_build_rate_limit_headers(build)
+    invalidate_rate_limit_caches()
+    assert await get_or_build_rate_limit_headers(build) == {"x-codex-primary-used-percent": "11.0"}
+    assert await get_or_build_rate_limit_headers(build) == {"x-codex-primary-used-percent": "11.0"}
+
+
+@pytest.mark.asyncio
+async def test_instances_do_not_share_entries():
+    first = RateLimitHeaderCache(ttl_seconds=60)
+    second = RateLimitHeaderCache(ttl_seconds=60)
+
+    async def build_first() -> dict[str, str]:
+        return {"x-codex-primary-used-percent": "1.0"}
+
+    async def build_second() -> dict[str, str]:
+        return {"x-codex-primary-used-percent": "2.0"}
+
+    assert await first.get_or_build(build_first) == {"x-codex-primary-used-percent": "1.0"}
+    assert await second.get_or_build(build_second) == {"x-codex-primary-used-percent": "2.0"}
+    second.invalidate()
+    assert await first.get_or_build(build_second) == {"x-codex-primary-used-percent": "1.0"}
+
+
+@pytest.mark.asyncio
+async def test_usage_view_cache_is_invalidated_with_headers():
+    calls = 0
+
+    async def build() -> RateLimitUsageViewData | None:
+        nonlocal calls
+        calls += 1
+        return RateLimitUsageViewData(
+            plan_type=f"plus-{calls}",
+            primary_summary=None,
+            primary_rows=[],
+            secondary_summary=None,
+            secondary_rows=[],
+            credits=None,
+        )
+
+    first = await get_or_build_rate_limit_usage_view(build)
+    assert await get_or_build_rate_limit_usage_view(build) is first
+    assert calls == 1
+
+    invalidate_rate_limit_caches()
+    rebuilt = await get_or_build_rate_limit_usage_view(build)
+    assert rebuilt is not None
+    assert rebuilt.plan_type == "plus-2"
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import pytest
+
+from app.core.request_logs.buffer import RequestLogCreate
+from app.core.request_logs.flush_scheduler import RequestLogsFlushScheduler
+from app.core.utils.time import utcnow
+
+pytestmark = pytest.mark.unit
+
+
+def _entry(request_id: str) -> RequestLogCreate:
+    return RequestLogCreate(
+        account_id="acc",
+        request_id=request_id,
+        model="gpt-5.1",
+        input_tokens=None,
+        output_tokens=None,
+        cached_input_tokens=None,
+        reasoning_tokens=None,
+        reasoning_effort=None,
+        latency_ms=None,
+        status="success",
+        error_code=None,
+        error_message=None,
+        prompt_cache_key_hash=None,
+        codex_session_id=None,
+        codex_conversation_id=None,
+        requested_at=utcnow(),
+    )
+
+
+async def test_flush_once_drains_backlog_in_max_batch_chunks(monkeypatch, request_log_buffer) -> None:
+    buffer = request_log_buffer
+    for index in range(5):
+        assert buffer.try_enqueue(_entry(f"req-{index}"))
+
+    scheduler = RequestLogsFlushScheduler(interval_seconds=60.0, max_batch=2, enabled=True)
+    batches: list[list[str]] = []
+
+    async def fake_flush_batch(self: RequestLogsFlushScheduler, batch: list[RequestLogCreate]) -> None:
+        batches.append([entry.request_id for entry in batch])
+        # Entries arriving mid-flush are left for the next tick.
+        buffer.try_enqueue(_entry("late"))
+
+    monkeypatch.setattr(RequestLogsFlushScheduler, "_flush_batch", fake_flush_batch)
+
+    await scheduler._flush_once()
+
+    assert batches == [["req-0", "req-1"], ["req-2", "req-3"], ["req-4"]]
+    assert buffer.size() == 3
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import json
+
 import pytest
 
-from app.core.utils.sse import format_sse_event
+from app.core.utils.sse import dump_sse_json, format_sse_event
 
 pytestmark = pytest.mark.unit
 
@@ -11,3 +13,8 @@ def test_format_sse_event_serializes_payload():
     payload = {"type": "response.completed", "response": {"id": "resp_1"}}
     result = format_sse_event(payload)
     assert result == 'event: response.completed\ndata: {"type":"response.completed","response":{"id":"resp_1"}}\n\n'
+
+
+def test_dump_sse_json_matches_compact_json_dumps():
+    payload = {"type": "response.output_text.delta", "delta": 'héllo "q"', "output_index": 0}
+    assert dump_sse_json(payload) == json.dumps(payload, ensure_ascii=True, separators=(",", ":"))
@@ -55,22 +55,27 @@ class StubUsageRepository:
         *,
         commit: bool = True,
     ) -> UsageHistory | None:
-        self.entries.append(
-            UsageEntry(
-                account_id=account_id,
-                used_percent=used_percent,
-                input_tokens=input_tokens,
-                output_tokens=output_tokens,
-                recorded_at=recorded_at,
-                window=window,
-                reset_at=reset_at,
-                window_minutes=window_minutes,
-                credits_has=credits_has,
-                credits_unlimited=credits_unlimited,
-                credits_balance=credits_balance,
-            )
+        entry = UsageEntry(
+            account_id=account_id,
+            used_percent=used_percent,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            recorded_at=recorded_at,
+            window=window,
+            reset_at=reset_at,
+            window_minutes=window_minutes,
+            credits_has=credits_has,
+            credits_unlimited=credits_unlimited,
+            credits_balance=credits_balance,
+        )
+        self.entries.append(entry)
+        return UsageHistory(
+            account_id=account_id,
+            used_percent=used_percent,
+            window=window,
+            reset_at=reset_at,
+            window_minutes=window_minutes,
         )
-        return None
 
 
 def _make_account(account_id: str, chatgpt_account_id: str, email: str = "a@example.com") -> Account:
@@ -132,6 +137,43 @@ async def test_usage_updater_includes_chatgpt_account_id_even_when_shared(monkey
     assert [call["account_id"] for call in calls] == [shared, shared, "workspace_unique"]
 
 
+@pytest.mark.asyncio
+async def test_usage_updater_returns_refreshed_secondary_rows(monkeypatch) -> None:
+    monkeypatch.setenv("CODEX_LB_USAGE_REFRESH_ENABLED", "true")
+    from app.core.config.settings import get_settings
+
+    get_settings.cache_clear()
+
+    async def stub_fetch_usage(**_: Any) -> UsagePayload:
+        return UsagePayload.model_validate(
+            {
+                "rate_limit": {
+                    "primary_window": {
+                        "used_percent": 10.0,
+                        "reset_at": 1735689600,
+                        "limit_window_seconds": 18000,
+                    },
+                    "secondary_window": {
+                        "used_percent": 40.0,
+                        "reset_at": 1736294400,
+                        "limit_window_seconds": 604800,
+                    },
+                }
+            }
+        )
+
+    monkeypatch.setattr("app.modules.usage.updater.fetch_usage", stub_fetch_usage)
+
+    updater = UsageUpdater(StubUsageRepository(), accounts_repo=None)
+    acc = _make_account("acc_refreshed", "workspace_refreshed")
+
+    refreshed_secondary = await updater.refresh_accounts([acc], latest_usage={})
+
+    assert list(refreshed_secondary) == ["acc_refreshed"]
+    assert refreshed_secondary["acc_refreshed"].used_percent == 40.0
+    assert refreshed_secondary["acc_refreshed"].window_minutes == 10080
+
+
 class StubAccountsRepository:
     def __init__(self) -> None:
         self.status_updates: list[dict[str, Any]] = []